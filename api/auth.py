@@ -143,8 +143,7 @@ def generate_oauth_state() -> str:
     """Generate a secure random state for OAuth"""
     state = secrets.token_urlsafe(32)
     oauth_states[state] = {
-        "created_at": datetime.utcnow(),
-        "used": False
+        "created_at": datetime.utcnow()
     }
     # Clean up old states (older than 10 minutes)
     cutoff = datetime.utcnow() - timedelta(minutes=10)
@@ -155,16 +154,10 @@ def generate_oauth_state() -> str:
 
 def verify_oauth_state(state: str) -> bool:
     """Verify OAuth state to prevent CSRF"""
-    if state not in oauth_states:
+    state_data = oauth_states.pop(state, None)
+    if state_data is None:
         return False
-    state_data = oauth_states[state]
-    if state_data["used"]:
-        return False
-    if datetime.utcnow() - state_data["created_at"] > timedelta(minutes=10):
-        del oauth_states[state]
-        return False
-    oauth_states[state]["used"] = True
-    return True
+    return datetime.utcnow() - state_data["created_at"] <= timedelta(minutes=10)
 
 def get_google_oauth_url() -> str:
     """Generate Google OAuth URL"""
@@ -37,7 +37,7 @@ async def google_auth_callback(
         # Trigger initial email sync
         try:
             logger.info(f"Starting initial email sync for user {user.email}")
-            result = gmail_service.fetch_emails(db, user, max_results=50)
+            result = await asyncio.to_thread(gmail_service.fetch_emails, db, user, max_results=50)
             logger.info(f"Initial sync completed: {len(result['emails'])} emails fetched")
         except Exception as sync_error:
             logger.error(f"Initial sync failed: {sync_error}")
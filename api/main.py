@@ -22,8 +22,9 @@ from api.auth import (get_current_user, get_or_create_user, create_access_token,
 from api.models import *
 from api.routes import emails, actions, huddles, trash, saig, intelligence
 from api.middleware import AuthMiddleware
-from core.database import get_db, User, Email
+from core.database import get_db, init_db, User, Email
 from core.gmail_service import GmailService
+from core.oauth_config import oauth_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -82,12 +83,31 @@ async def sync_emails_background():
         # Always wait between sync attempts
         await asyncio.sleep(30)
 
+# Background trash cleanup
+async def clean_trash_background():
+    """Background task to delete expired trash for all users once a day"""
+    await asyncio.sleep(60)  # Initial delay before starting
+    while True:
+        try:
+            await asyncio.to_thread(trash.clean_expired_trash)
+        except Exception as e:
+            logger.error(f"Trash cleanup error: {e}")
+        
+        await asyncio.sleep(24 * 60 * 60)
+
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on app startup"""
+    init_db()
     asyncio.create_task(sync_emails_background())
+    asyncio.create_task(clean_trash_background())
     logger.info("SAIGBOX V3 started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close shared outbound HTTP clients"""
+    await oauth_manager.close()
+
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request, current_user: Optional[User] = Depends(get_current_user_optional)):
     """Serve the main application or redirect to login"""
@@ -218,7 +238,7 @@ async def google_auth_callback(
         # Trigger initial email sync
         try:
             logger.info(f"Starting initial email sync for user {user.email}")
-            result = gmail_service.fetch_emails(db, user, max_results=50)
+            result = await asyncio.to_thread(gmail_service.fetch_emails, db, user, max_results=50)
             logger.info(f"Initial sync completed: {len(result['emails'])} emails fetched")
         except Exception as sync_error:
             logger.error(f"Initial sync failed: {sync_error}")
@@ -402,7 +422,10 @@ async def trigger_sync(
         token = page_token or app.state.gmail_tokens.get(user_token_key)
         
         # Fetch emails with fallback support
-        result = gmail_service.fetch_emails(db, current_user, max_results=max_results, page_token=token)
+        # Blocking Gmail and DB I/O runs in a worker thread, keeping the event loop free
+        result = await asyncio.to_thread(
+            gmail_service.fetch_emails, db, current_user, max_results=max_results, page_token=token
+        )
         
         # Check if fallback was used
         if result.get('fallback') or result.get('cached'):
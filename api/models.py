@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -66,9 +66,44 @@ class Email(EmailBase):
     created_at: datetime
     updated_at: datetime
     
+    @field_validator("recipients", "cc", "bcc", "labels", "attachments", mode="before")
+    @classmethod
+    def _none_to_list(cls, v):
+        # Legacy rows may still hold NULL in list columns
+        return v or []
+    
+    class Config:
+        from_attributes = True
+
+class TrashedEmail(BaseModel):
+    """Trash listing row; omits body_html, which the trash view never renders"""
+    id: str
+    gmail_id: Optional[str] = None
+    subject: Optional[str] = None
+    sender: Optional[str] = None
+    sender_name: Optional[str] = None
+    recipients: List[str] = []
+    snippet: Optional[str] = None
+    body_text: Optional[str] = None
+    labels: List[str] = []
+    is_read: bool = False
+    is_starred: bool = False
+    has_attachments: bool = False
+    received_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
+    
+    @field_validator("recipients", "labels", mode="before")
+    @classmethod
+    def _none_to_list(cls, v):
+        return v or []
+    
     class Config:
         from_attributes = True
 
+class TrashPage(BaseModel):
+    emails: List[TrashedEmail]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch older emails
+
 class ActionItemPriority(str, Enum):
     HIGH = "high"
     MEDIUM = "medium"
@@ -147,6 +182,10 @@ class HuddleMessage(BaseModel):
     class Config:
         from_attributes = True
 
+class HuddleMessagePage(BaseModel):
+    messages: List[HuddleMessage]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch older messages
+
 class HuddleEmailShare(BaseModel):
     email_id: str
 
@@ -184,6 +223,14 @@ class SearchQuery(BaseModel):
     in_body: bool = True
     in_sender: bool = True
     
+class TrashRestoreRequest(BaseModel):
+    email_ids: List[str] = Field(..., min_length=1)
+
+class TrashRestoreResponse(BaseModel):
+    restored_count: int
+    success: bool
+    message: str
+
 class TrashEmptyResponse(BaseModel):
     deleted_count: int
     success: bool
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, func
 from typing import List, Optional, Dict, Any
@@ -25,22 +26,7 @@ logger = logging.getLogger(__name__)
 urgent_email_queue = asyncio.Queue()
 processing_urgent = False
 
-def clean_email_data(emails):
-    """Clean email data to ensure lists are not None"""
-    for email in emails:
-        if email.labels is None:
-            email.labels = []
-        if email.attachments is None:
-            email.attachments = []
-        if email.recipients is None:
-            email.recipients = []
-        if email.cc is None:
-            email.cc = []
-        if email.bcc is None:
-            email.bcc = []
-    return emails
-
-@router.get("/", response_model=EmailListResponse)
+@router.get("/", response_model=EmailListResponse, response_class=ORJSONResponse)
 async def list_emails(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
@@ -92,9 +78,6 @@ async def list_emails(
     offset = (page - 1) * limit
     emails = query.order_by(EmailModel.received_at.desc()).offset(offset).limit(limit).all()
     
-    # Clean email data
-    emails = clean_email_data(emails)
-    
     # Calculate pagination info
     pages = (total + limit - 1) // limit
     
@@ -107,7 +90,7 @@ async def list_emails(
         has_prev=page > 1
     )
 
-@router.get("/sent", response_model=EmailListResponse)
+@router.get("/sent", response_model=EmailListResponse, response_class=ORJSONResponse)
 async def list_sent_emails(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
@@ -136,9 +119,6 @@ async def list_sent_emails(
     offset = (page - 1) * limit
     emails = query.order_by(EmailModel.received_at.desc()).offset(offset).limit(limit).all()
     
-    # Clean email data
-    emails = clean_email_data(emails)
-    
     # Calculate pagination info
     pages = (total + limit - 1) // limit
     
@@ -152,7 +132,7 @@ async def list_sent_emails(
     )
 
 @router.get("/{email_id}", response_model=Email)
-async def get_email(
+def get_email(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -166,10 +146,14 @@ async def get_email(
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
     
+    # Rows synced from metadata only have no body yet; load it on first open
+    if email.gmail_id and email.body_text is None and email.body_html is None:
+        gmail_service.hydrate_body(db, current_user, email)
+    
     return email
 
 @router.put("/{email_id}/read")
-async def mark_as_read(
+def mark_as_read(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -185,7 +169,7 @@ async def mark_as_read(
     
     # Update in Gmail
     if email.gmail_id and not email.is_read:
-        success = gmail_service.mark_as_read(current_user, email.gmail_id)
+        success = gmail_service.mark_as_read(current_user, email.gmail_id, db)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update Gmail")
     
@@ -196,7 +180,7 @@ async def mark_as_read(
     return {"success": True, "message": "Email marked as read"}
 
 @router.put("/{email_id}/unread")
-async def mark_as_unread(
+def mark_as_unread(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -212,7 +196,7 @@ async def mark_as_unread(
     
     # Update in Gmail
     if email.gmail_id and email.is_read:
-        success = gmail_service.mark_as_unread(current_user, email.gmail_id)
+        success = gmail_service.mark_as_unread(current_user, email.gmail_id, db)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update Gmail")
     
@@ -223,7 +207,7 @@ async def mark_as_unread(
     return {"success": True, "message": "Email marked as unread"}
 
 @router.put("/{email_id}/star")
-async def star_email(
+def star_email(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -243,9 +227,9 @@ async def star_email(
     # Update in Gmail
     if email.gmail_id:
         if new_status:
-            success = gmail_service.star_email(current_user, email.gmail_id)
+            success = gmail_service.star_email(current_user, email.gmail_id, db)
         else:
-            success = gmail_service.unstar_email(current_user, email.gmail_id)
+            success = gmail_service.unstar_email(current_user, email.gmail_id, db)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update Gmail")
@@ -261,7 +245,7 @@ async def star_email(
     }
 
 @router.delete("/{email_id}")
-async def delete_email(
+def delete_email(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -303,7 +287,7 @@ async def delete_email(
     return {"success": True, "message": "Email moved to trash"}
 
 @router.post("/compose", response_model=dict)
-async def compose_email(
+def compose_email(
     email_data: EmailCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -345,7 +329,7 @@ async def compose_email(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/reply", response_model=dict)
-async def reply_to_email(
+def reply_to_email(
     reply_data: EmailReply,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -466,24 +450,33 @@ async def generate_email_summary(
         logger.error(f"Error generating summary: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Compiled once; clean_email_text runs for every summarized email
+WHITESPACE_RE = re.compile(r'\s+')
+INLINE_HEADER_RE = re.compile(r'^(From|To|Subject|Date|Sent):.*$', re.MULTILINE)
+QUOTED_LINE_RE = re.compile(r'^>.*$', re.MULTILINE)
+SIGNATURE_RES = (
+    re.compile(r'--\s*\n.*', re.DOTALL),
+    re.compile(r'Best regards.*', re.DOTALL | re.IGNORECASE),
+    re.compile(r'Sincerely.*', re.DOTALL | re.IGNORECASE),
+)
+
 def clean_email_text(text: str) -> str:
     """Clean email text for summarization"""
     if not text:
         return ""
     
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
     
     # Remove email headers that might be in the body
-    text = re.sub(r'^(From|To|Subject|Date|Sent):.*$', '', text, flags=re.MULTILINE)
+    text = INLINE_HEADER_RE.sub('', text)
     
     # Remove quoted text (lines starting with >)
-    text = re.sub(r'^>.*$', '', text, flags=re.MULTILINE)
+    text = QUOTED_LINE_RE.sub('', text)
     
     # Remove email signatures (basic detection)
-    text = re.sub(r'--\s*\n.*', '', text, flags=re.DOTALL)
-    text = re.sub(r'Best regards.*', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'Sincerely.*', '', text, flags=re.DOTALL | re.IGNORECASE)
+    for pattern in SIGNATURE_RES:
+        text = pattern.sub('', text)
     
     return text.strip()
 
@@ -687,13 +680,16 @@ async def sync_emails(
         synced_count = 0
         urgent_count = 0
         
+        # Look up which of the fetched messages are already stored in one IN query
+        fetched_ids = [email_data.get('gmail_id') for email_data in new_emails]
+        existing_ids = {
+            gmail_id for (gmail_id,) in db.query(EmailModel.gmail_id).filter(
+                EmailModel.gmail_id.in_(fetched_ids)
+            )
+        } if fetched_ids else set()
+        
         for email_data in new_emails:
-            # Check if email already exists
-            existing = db.query(EmailModel).filter(
-                EmailModel.gmail_id == email_data.get('gmail_id')
-            ).first()
-            
-            if not existing:
+            if email_data.get('gmail_id') not in existing_ids:
                 # Create new email record
                 email = EmailModel(
                     user_id=current_user.id,
@@ -727,6 +723,7 @@ async def sync_emails(
                     await urgent_email_queue.put((email, current_user))
                 
                 db.add(email)
+                existing_ids.add(email.gmail_id)
                 synced_count += 1
         
         db.commit()
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload, raiseload
+from typing import List, Optional, Tuple
 from datetime import datetime
+import os
 
 from api.auth import get_current_user
 from api.models import *
@@ -11,37 +13,47 @@ from core.database import (
     HuddleMember as HuddleMemberModel,
     HuddleMessage as HuddleMessageModel,
     HuddleEmail as HuddleEmailModel,
-    Email
+    Email,
+    dialect_insert
 )
 
 router = APIRouter()
 
+# Huddle reads eager-load members; set STRICT_LAZY_LOADS=1 in development to turn any
+# remaining lazy load (an N+1 in the making) into an error instead of a query
+HUDDLE_LOAD_OPTIONS = [selectinload(HuddleModel.members)]
+if os.getenv("STRICT_LAZY_LOADS") == "1":
+    HUDDLE_LOAD_OPTIONS.append(raiseload("*"))
+
+def _is_member(db: Session, huddle_id: str, user_email: str) -> bool:
+    """EXISTS check for huddle membership without hydrating a member row"""
+    return db.query(
+        db.query(HuddleMemberModel).filter(
+            HuddleMemberModel.huddle_id == huddle_id,
+            HuddleMemberModel.user_email == user_email
+        ).exists()
+    ).scalar()
+
 @router.get("/", response_model=List[Huddle])
-async def list_huddles(
+def list_huddles(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """List all huddles user is part of"""
-    # Get huddles created by user
-    created_huddles = db.query(HuddleModel).filter(
-        HuddleModel.created_by == current_user.id
-    ).all()
-    
-    # Get huddles user is member of
-    member_huddles = db.query(HuddleModel).join(HuddleMemberModel).filter(
+    # Huddles created by the user or joined as a member, with members eager-loaded
+    member_huddle_ids = db.query(HuddleMemberModel.huddle_id).filter(
         HuddleMemberModel.user_email == current_user.email
+    )
+    all_huddles = db.query(HuddleModel).options(*HUDDLE_LOAD_OPTIONS).filter(
+        or_(
+            HuddleModel.created_by == current_user.id,
+            HuddleModel.id.in_(member_huddle_ids)
+        )
     ).all()
     
-    # Combine and deduplicate
-    all_huddles = list(set(created_huddles + member_huddles))
-    
     # Convert to response model with members
     huddles = []
     for huddle in all_huddles:
-        members = db.query(HuddleMemberModel).filter(
-            HuddleMemberModel.huddle_id == huddle.id
-        ).all()
-        
         huddles.append(Huddle(
             id=huddle.id,
             name=huddle.name,
@@ -54,36 +66,28 @@ async def list_huddles(
                 "email": m.user_email,
                 "role": m.role,
                 "joined_at": m.joined_at.isoformat()
-            } for m in members]
+            } for m in huddle.members]
         ))
     
     return huddles
 
 @router.get("/{huddle_id}", response_model=Huddle)
-async def get_huddle(
+def get_huddle(
     huddle_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get huddle details"""
-    huddle = db.query(HuddleModel).filter(HuddleModel.id == huddle_id).first()
+    huddle = db.query(HuddleModel).options(*HUDDLE_LOAD_OPTIONS).filter(HuddleModel.id == huddle_id).first()
     
     if not huddle:
         raise HTTPException(status_code=404, detail="Huddle not found")
     
     # Check if user is member or creator
-    is_member = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id,
-        HuddleMemberModel.user_email == current_user.email
-    ).first()
-    
-    if not is_member and huddle.created_by != current_user.id:
+    if huddle.created_by != current_user.id and not _is_member(db, huddle_id, current_user.email):
         raise HTTPException(status_code=403, detail="Not authorized to view this huddle")
     
-    # Get members
-    members = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id
-    ).all()
+    members = huddle.members
     
     return Huddle(
         id=huddle.id,
@@ -101,7 +105,7 @@ async def get_huddle(
     )
 
 @router.post("/", response_model=Huddle)
-async def create_huddle(
+def create_huddle(
     huddle_data: HuddleCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -125,8 +129,8 @@ async def create_huddle(
     )
     db.add(creator_member)
     
-    # Add other members
-    for email in huddle_data.member_emails:
+    # Add other members (deduplicated, members are unique per huddle)
+    for email in dict.fromkeys(huddle_data.member_emails):
         if email != current_user.email:  # Skip if already added as owner
             member = HuddleMemberModel(
                 huddle_id=new_huddle.id,
@@ -159,7 +163,7 @@ async def create_huddle(
     )
 
 @router.put("/{huddle_id}", response_model=Huddle)
-async def update_huddle(
+def update_huddle(
     huddle_id: str,
     update_data: HuddleUpdate,
     current_user: User = Depends(get_current_user),
@@ -208,7 +212,7 @@ async def update_huddle(
     )
 
 @router.post("/{huddle_id}/members")
-async def add_member(
+def add_member(
     huddle_id: str,
     member_data: HuddleMemberAdd,
     current_user: User = Depends(get_current_user),
@@ -220,40 +224,37 @@ async def add_member(
     if not huddle:
         raise HTTPException(status_code=404, detail="Huddle not found")
     
-    # Check if user is owner or admin
-    user_member = db.query(HuddleMemberModel).filter(
+    # Check if user is owner or admin (only the role column is needed)
+    user_role = db.query(HuddleMemberModel.role).filter(
         HuddleMemberModel.huddle_id == huddle_id,
         HuddleMemberModel.user_email == current_user.email
-    ).first()
+    ).scalar()
     
-    if not user_member and huddle.created_by != current_user.id:
+    if user_role is None and huddle.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    if user_member and user_member.role not in ["owner", "admin"]:
+    if user_role is not None and user_role not in ["owner", "admin"]:
         raise HTTPException(status_code=403, detail="Only owner/admin can add members")
     
-    # Check if member already exists
-    existing = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id,
-        HuddleMemberModel.user_email == member_data.email
-    ).first()
+    # Add new member; the unique constraint rejects duplicates in the same round trip
+    result = db.execute(
+        dialect_insert(HuddleMemberModel).values(
+            huddle_id=huddle_id,
+            user_email=member_data.email,
+            role=member_data.role
+        ).on_conflict_do_nothing(index_elements=["huddle_id", "user_email"])
+    )
     
-    if existing:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Member already exists")
     
-    # Add new member
-    new_member = HuddleMemberModel(
-        huddle_id=huddle_id,
-        user_email=member_data.email,
-        role=member_data.role
-    )
-    db.add(new_member)
     db.commit()
     
     return {"success": True, "message": f"Added {member_data.email} to huddle"}
 
 @router.delete("/{huddle_id}/members/{email}")
-async def remove_member(
+def remove_member(
     huddle_id: str,
     email: str,
     current_user: User = Depends(get_current_user),
@@ -286,54 +287,93 @@ async def remove_member(
     
     return {"success": True, "message": f"Removed {email} from huddle"}
 
-@router.get("/{huddle_id}/messages", response_model=List[HuddleMessage])
-async def get_messages(
+def encode_message_cursor(message: HuddleMessageModel) -> str:
+    """Opaque keyset cursor for the message a page ended on"""
+    created_at = message.created_at.isoformat() if message.created_at else ''
+    return f"{created_at}~{message.id}"
+
+def decode_message_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    created_at, sep, message_id = cursor.partition('~')
+    if not sep or not message_id:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return (datetime.fromisoformat(created_at) if created_at else None), message_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/{huddle_id}/messages", response_model=HuddleMessagePage)
+def get_messages(
     huddle_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get huddle messages"""
-    # Check if user is member
-    is_member = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id,
-        HuddleMemberModel.user_email == current_user.email
-    ).first()
-    
-    huddle = db.query(HuddleModel).filter(HuddleModel.id == huddle_id).first()
-    
-    if not huddle:
-        raise HTTPException(status_code=404, detail="Huddle not found")
-    
-    if not is_member and huddle.created_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Get messages
-    messages = db.query(HuddleMessageModel).filter(
-        HuddleMessageModel.huddle_id == huddle_id
-    ).order_by(HuddleMessageModel.created_at.desc()).limit(50).all()
+    """Get huddle messages, newest first (undated last), paginated by `cursor`"""
+    # Authorization and fetch in one query: rows only come back for the creator or a member
+    query = db.query(HuddleMessageModel).join(
+        HuddleModel, HuddleModel.id == HuddleMessageModel.huddle_id
+    ).outerjoin(
+        HuddleMemberModel,
+        and_(
+            HuddleMemberModel.huddle_id == HuddleModel.id,
+            HuddleMemberModel.user_email == current_user.email
+        )
+    ).filter(
+        HuddleMessageModel.huddle_id == huddle_id,
+        or_(
+            HuddleMemberModel.id.isnot(None),
+            HuddleModel.created_by == current_user.id
+        )
+    )
+    if cursor:
+        # Keyset on (created_at, id) so messages sharing a timestamp are never skipped
+        created_at, message_id = decode_message_cursor(cursor)
+        if created_at is None:
+            query = query.filter(HuddleMessageModel.created_at.is_(None), HuddleMessageModel.id < message_id)
+        else:
+            query = query.filter(or_(
+                HuddleMessageModel.created_at < created_at,
+                and_(HuddleMessageModel.created_at == created_at, HuddleMessageModel.id < message_id),
+                HuddleMessageModel.created_at.is_(None)
+            ))
+    
+    # Keyset pagination over the (huddle_id, created_at) index
+    messages = query.order_by(
+        HuddleMessageModel.created_at.desc().nulls_last(), HuddleMessageModel.id.desc()
+    ).limit(limit).all()
+    
+    if not messages:
+        # Nothing returned: tell apart a missing huddle, no access, and an empty page
+        huddle = db.query(HuddleModel.created_by).filter(HuddleModel.id == huddle_id).first()
+        
+        if not huddle:
+            raise HTTPException(status_code=404, detail="Huddle not found")
+        
+        # Check if user is member or creator
+        if huddle.created_by != current_user.id and not _is_member(db, huddle_id, current_user.email):
+            raise HTTPException(status_code=403, detail="Not authorized")
     
-    return messages
+    return HuddleMessagePage(
+        messages=messages,
+        next_cursor=encode_message_cursor(messages[-1]) if len(messages) == limit else None
+    )
 
 @router.post("/{huddle_id}/messages", response_model=HuddleMessage)
-async def send_message(
+def send_message(
     huddle_id: str,
     message_data: HuddleMessageCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Send message to huddle"""
-    # Check if user is member
-    is_member = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id,
-        HuddleMemberModel.user_email == current_user.email
-    ).first()
-    
     huddle = db.query(HuddleModel).filter(HuddleModel.id == huddle_id).first()
     
     if not huddle:
         raise HTTPException(status_code=404, detail="Huddle not found")
     
-    if not is_member and huddle.created_by != current_user.id:
+    # Check if user is member or creator
+    if huddle.created_by != current_user.id and not _is_member(db, huddle_id, current_user.email):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Create message
@@ -349,7 +389,7 @@ async def send_message(
     return new_message
 
 @router.post("/{huddle_id}/emails")
-async def share_email(
+def share_email(
     huddle_id: str,
     share_data: HuddleEmailShare,
     current_user: User = Depends(get_current_user),
@@ -365,36 +405,28 @@ async def share_email(
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    # Check if user is member
-    is_member = db.query(HuddleMemberModel).filter(
-        HuddleMemberModel.huddle_id == huddle_id,
-        HuddleMemberModel.user_email == current_user.email
-    ).first()
-    
     huddle = db.query(HuddleModel).filter(HuddleModel.id == huddle_id).first()
     
     if not huddle:
         raise HTTPException(status_code=404, detail="Huddle not found")
     
-    if not is_member and huddle.created_by != current_user.id:
+    # Check if user is member or creator
+    if huddle.created_by != current_user.id and not _is_member(db, huddle_id, current_user.email):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Check if email already shared
-    existing = db.query(HuddleEmailModel).filter(
-        HuddleEmailModel.huddle_id == huddle_id,
-        HuddleEmailModel.email_id == share_data.email_id
-    ).first()
+    # Share email; the unique constraint rejects duplicates in the same round trip
+    result = db.execute(
+        dialect_insert(HuddleEmailModel).values(
+            huddle_id=huddle_id,
+            email_id=share_data.email_id,
+            shared_by=current_user.email
+        ).on_conflict_do_nothing(index_elements=["huddle_id", "email_id"])
+    )
     
-    if existing:
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Email already shared")
     
-    # Share email
-    shared_email = HuddleEmailModel(
-        huddle_id=huddle_id,
-        email_id=share_data.email_id,
-        shared_by=current_user.email
-    )
-    db.add(shared_email)
     db.commit()
     
     return {"success": True, "message": "Email shared with huddle"}
\ No newline at end of file
@@ -2,9 +2,11 @@
 Intelligence API endpoints for advanced SAIG features
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, load_only
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import time
 
 from api.auth import get_current_user
 from core.database import get_db, User, Email
@@ -17,6 +19,23 @@ logger = logging.getLogger(__name__)
 # Initialize intelligence module
 saig_intelligence = SAIGIntelligence()
 
+# Short-lived per-user cache for mailbox-wide analytics (patterns change slowly)
+INSIGHTS_CACHE_TTL = 60
+_insights_cache: Dict[tuple, tuple] = {}
+
+def _get_cached(namespace: str, user_id: str) -> Optional[Dict[str, Any]]:
+    entry = _insights_cache.get((namespace, user_id))
+    if entry and time.monotonic() - entry[0] < INSIGHTS_CACHE_TTL:
+        return entry[1]
+    return None
+
+def _set_cached(namespace: str, user_id: str, value: Dict[str, Any]) -> None:
+    _insights_cache[(namespace, user_id)] = (time.monotonic(), value)
+
+def _invalidate_cached(user_id: str) -> None:
+    for namespace in ("patterns", "insights"):
+        _insights_cache.pop((namespace, user_id), None)
+
 @router.get("/patterns")
 async def analyze_email_patterns(
     current_user: User = Depends(get_current_user),
@@ -24,11 +43,17 @@ async def analyze_email_patterns(
 ):
     """Analyze user's email patterns and get proactive suggestions"""
     try:
+        cached = _get_cached("patterns", current_user.id)
+        if cached is not None:
+            return cached
+        
         patterns = await saig_intelligence.analyze_email_patterns(db, current_user)
-        return {
+        response = {
             "success": True,
             "patterns": patterns
         }
+        _set_cached("patterns", current_user.id, response)
+        return response
     except Exception as e:
         logger.error(f"Error analyzing patterns: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,8 +117,11 @@ async def predict_email_importance(
 ):
     """Predict the importance of an email"""
     try:
-        # Get the email
-        email = db.query(Email).filter(
+        # Get the email (metadata only; the predictor never reads the bodies)
+        email = db.query(Email).options(
+            load_only(Email.id, Email.subject, Email.snippet, Email.sender,
+                      Email.sender_name, Email.has_attachments)
+        ).filter(
             Email.id == email_id,
             Email.user_id == current_user.id
         ).first()
@@ -140,6 +168,7 @@ async def record_user_preference(
         
         # Learn from the action
         await saig_intelligence.learn_user_preferences(db, current_user, action, email)
+        _invalidate_cached(current_user.id)
         
         return {
             "success": True,
@@ -177,8 +206,10 @@ async def categorize_email(
 ):
     """Categorize an email using AI"""
     try:
-        # Get the email
-        email = db.query(Email).filter(
+        # Get the email (metadata only; the categorizer never reads the bodies)
+        email = db.query(Email).options(
+            load_only(Email.id, Email.subject, Email.snippet, Email.labels, Email.category)
+        ).filter(
             Email.id == email_id,
             Email.user_id == current_user.id
         ).first()
@@ -190,11 +221,12 @@ async def categorize_email(
         category = await saig_intelligence.detect_email_category(email)
         
         # Update email with category
-        if not email.labels:
-            email.labels = []
-        if category not in email.labels:
-            email.labels.append(f"CATEGORY/{category.upper()}")
+        label = f"CATEGORY/{category.upper()}"
+        if label not in (email.labels or []):
+            email.labels = (email.labels or []) + [label]
+            email.category = category
             db.commit()
+            _invalidate_cached(current_user.id)
         
         return {
             "success": True,
@@ -212,38 +244,32 @@ async def get_email_insights(
 ):
     """Get comprehensive email insights and analytics"""
     try:
+        cached = _get_cached("insights", current_user.id)
+        if cached is not None:
+            return cached
+        
         # Analyze patterns
         patterns = await saig_intelligence.analyze_email_patterns(db, current_user)
         
-        # Get additional insights
-        from sqlalchemy import func
+        # Email statistics in a single aggregate round trip
+        from sqlalchemy import func, case
         from datetime import timedelta
         
-        # Email statistics
-        total_emails = db.query(Email).filter(
-            Email.user_id == current_user.id,
-            Email.deleted_at.is_(None)
-        ).count()
-        
-        unread_emails = db.query(Email).filter(
-            Email.user_id == current_user.id,
-            Email.is_read == False,
-            Email.deleted_at.is_(None)
-        ).count()
-        
-        starred_emails = db.query(Email).filter(
-            Email.user_id == current_user.id,
-            Email.is_starred == True,
-            Email.deleted_at.is_(None)
-        ).count()
-        
-        # Recent activity
         recent_date = datetime.utcnow() - timedelta(days=7)
-        recent_received = db.query(Email).filter(
+        stats = db.query(
+            func.count(Email.id).label("total"),
+            func.count(case((Email.is_read == False, 1))).label("unread"),
+            func.count(case((Email.is_starred == True, 1))).label("starred"),
+            func.count(case((Email.received_at >= recent_date, 1))).label("recent")
+        ).filter(
             Email.user_id == current_user.id,
-            Email.received_at >= recent_date,
             Email.deleted_at.is_(None)
-        ).count()
+        ).one()
+        
+        total_emails = stats.total
+        unread_emails = stats.unread
+        starred_emails = stats.starred
+        recent_received = stats.recent
         
         insights = {
             "statistics": {
@@ -272,10 +298,12 @@ async def get_email_insights(
                 "priority": "medium"
             })
         
-        return {
+        response = {
             "success": True,
             "insights": insights
         }
+        _set_cached("insights", current_user.id, response)
+        return response
     except Exception as e:
         logger.error(f"Error getting insights: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -288,32 +316,38 @@ async def batch_categorize_emails(
 ):
     """Categorize multiple uncategorized emails"""
     try:
-        # Get uncategorized emails
-        emails = db.query(Email).filter(
+        # Get uncategorized emails; only the columns the categorizer reads are loaded
+        emails = db.query(Email).options(
+            load_only(Email.id, Email.subject, Email.snippet, Email.sender, Email.labels)
+        ).filter(
             Email.user_id == current_user.id,
-            Email.deleted_at.is_(None)
+            Email.deleted_at.is_(None),
+            Email.category.is_(None)
         ).limit(limit).all()
         
         categorized_count = 0
         categories_applied = {}
+        label_updates = []
         
         for email in emails:
-            # Check if already categorized
-            if email.labels and any(label.startswith("CATEGORY/") for label in email.labels):
-                continue
-            
             # Detect category
             category = await saig_intelligence.detect_email_category(email)
             
-            # Update email
-            if not email.labels:
-                email.labels = []
-            email.labels.append(f"CATEGORY/{category.upper()}")
+            label_updates.append({
+                "id": email.id,
+                "category": category,
+                "labels": (email.labels or []) + [f"CATEGORY/{category.upper()}"]
+            })
             
             categorized_count += 1
             categories_applied[category] = categories_applied.get(category, 0) + 1
         
+        # Single bulk UPDATE by primary key instead of per-object unit-of-work flushes
+        if label_updates:
+            db.execute(update(Email), label_updates)
         db.commit()
+        if categorized_count:
+            _invalidate_cached(current_user.id)
         
         return {
             "success": True,
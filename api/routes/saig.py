@@ -35,18 +35,23 @@ async def chat_with_saig(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history")
-async def get_chat_history(
+def get_chat_history(
     limit: int = 50,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get chat history with SAIG"""
-    history = db.query(ChatHistory).filter(
+    # Newest `limit` rows via the (user_id, created_at) index, returned oldest first
+    recent = db.query(
+        ChatHistory.id,
+        ChatHistory.role,
+        ChatHistory.message,
+        ChatHistory.created_at
+    ).filter(
         ChatHistory.user_id == current_user.id
-    ).order_by(ChatHistory.created_at.desc()).limit(limit).all()
+    ).order_by(ChatHistory.created_at.desc()).limit(limit).subquery()
     
-    # Reverse to get chronological order
-    history.reverse()
+    history = db.query(recent).order_by(recent.c.created_at.asc()).all()
     
     return [
         {
@@ -59,14 +64,15 @@ async def get_chat_history(
     ]
 
 @router.delete("/history")
-async def clear_chat_history(
+def clear_chat_history(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Clear chat history"""
+    # Bulk wipe; no need to reconcile the identity map for rows we never loaded
     db.query(ChatHistory).filter(
         ChatHistory.user_id == current_user.id
-    ).delete()
+    ).delete(synchronize_session=False)
     db.commit()
     
     return {"success": True, "message": "Chat history cleared"}
@@ -1,148 +1,283 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session, load_only
+from typing import Optional, Tuple
 from datetime import datetime, timedelta
+import logging
+import orjson
 
 from api.auth import get_current_user
-from api.models import Email, TrashEmptyResponse
-from core.database import get_db, User, Email as EmailModel
+from api.models import TrashedEmail, TrashPage, TrashRestoreRequest, TrashRestoreResponse, TrashEmptyResponse
+from core.database import get_db, SessionLocal, User, Email as EmailModel, delete_emails_where
 from core.gmail_service import GmailService
 
 router = APIRouter()
 gmail_service = GmailService()
+logger = logging.getLogger(__name__)
 
-def clean_email_data(emails):
-    """Clean email data to ensure lists are not None"""
-    for email in emails:
-        if email.labels is None:
-            email.labels = []
-        if email.attachments is None:
-            email.attachments = []
-        if email.recipients is None:
-            email.recipients = []
-        if email.cc is None:
-            email.cc = []
-        if email.bcc is None:
-            email.bcc = []
-    return emails
-
-@router.get("/", response_model=List[Email])
-async def list_trashed_emails(
+# Trashed emails older than this are permanently deleted
+TRASH_RETENTION_DAYS = 30
+
+# Columns TrashedEmail serializes (skips body_html)
+TRASHED_EMAIL_COLUMNS = load_only(
+    EmailModel.id, EmailModel.gmail_id, EmailModel.subject, EmailModel.sender,
+    EmailModel.sender_name, EmailModel.recipients, EmailModel.snippet, EmailModel.body_text,
+    EmailModel.labels, EmailModel.is_read, EmailModel.is_starred, EmailModel.has_attachments,
+    EmailModel.received_at, EmailModel.deleted_at
+)
+
+# Rows fetched per batch when streaming the trash export
+EXPORT_BATCH_SIZE = 200
+
+# Keep IN (...) lists under SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 900
+
+def encode_trash_cursor(email: EmailModel) -> str:
+    """Opaque keyset cursor for the row a trash page ended on"""
+    received_at = email.received_at.isoformat() if email.received_at else ''
+    return f"{received_at}~{email.id}"
+
+def decode_trash_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    received_at, sep, email_id = cursor.partition('~')
+    if not sep or not email_id:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return (datetime.fromisoformat(received_at) if received_at else None), email_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/", response_model=TrashPage, response_class=ORJSONResponse)
+def list_trashed_emails(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all emails in trash"""
-    emails = db.query(EmailModel).filter(
+    """List emails in trash, newest first (undated last), paginated by `cursor`"""
+    query = db.query(EmailModel).options(TRASHED_EMAIL_COLUMNS).filter(
         EmailModel.user_id == current_user.id,
         EmailModel.deleted_at.isnot(None)
-    ).order_by(EmailModel.received_at.desc()).all()
+    )
+    if cursor:
+        # Keyset on (received_at, id) so rows sharing a timestamp are never skipped
+        received_at, email_id = decode_trash_cursor(cursor)
+        if received_at is None:
+            query = query.filter(EmailModel.received_at.is_(None), EmailModel.id < email_id)
+        else:
+            query = query.filter(or_(
+                EmailModel.received_at < received_at,
+                and_(EmailModel.received_at == received_at, EmailModel.id < email_id),
+                EmailModel.received_at.is_(None)
+            ))
     
-    # Clean email data to ensure all list fields are not None
-    emails = clean_email_data(emails)
+    # Keyset pagination over the partial trashed-emails index
+    emails = query.order_by(
+        EmailModel.received_at.desc().nulls_last(), EmailModel.id.desc()
+    ).limit(limit).all()
     
-    return emails
+    return TrashPage(
+        emails=emails,
+        next_cursor=encode_trash_cursor(emails[-1]) if len(emails) == limit else None
+    )
+
+@router.get("/export")
+def export_trashed_emails(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream every trashed email as a JSON array"""
+    stmt = select(EmailModel).options(TRASHED_EMAIL_COLUMNS).where(
+        EmailModel.user_id == current_user.id,
+        EmailModel.deleted_at.isnot(None)
+    ).order_by(EmailModel.received_at.desc()).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    def generate():
+        # Rows arrive in batches, so memory stays bounded by EXPORT_BATCH_SIZE
+        yield b"["
+        for index, email in enumerate(db.execute(stmt).scalars()):
+            if index:
+                yield b","
+            yield orjson.dumps(TrashedEmail.model_validate(email).model_dump())
+        yield b"]"
+    
+    return StreamingResponse(generate(), media_type="application/json")
 
 @router.post("/{email_id}/restore")
-async def restore_email(
+def restore_email(
     email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Restore email from trash"""
-    email = db.query(EmailModel).filter(
+    trashed = (
         EmailModel.id == email_id,
         EmailModel.user_id == current_user.id,
         EmailModel.deleted_at.isnot(None)
-    ).first()
+    )
     
-    if not email:
+    # Clear deleted_at in one statement; RETURNING tells us whether a row matched
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(
+            update(EmailModel).where(*trashed).values(deleted_at=None).returning(EmailModel.gmail_id)
+        ).first()
+    else:
+        row = db.query(EmailModel.gmail_id).filter(*trashed).first()
+        if row:
+            db.execute(update(EmailModel).where(EmailModel.id == email_id).values(deleted_at=None))
+    
+    if not row:
         raise HTTPException(status_code=404, detail="Trashed email not found")
     
     # Restore in Gmail
-    if email.gmail_id:
-        success = gmail_service.restore_from_trash(current_user, email.gmail_id)
+    if row.gmail_id:
+        success = gmail_service.restore_from_trash(current_user, row.gmail_id)
         if not success:
+            db.rollback()
             raise HTTPException(status_code=500, detail="Failed to restore email in Gmail")
     
-    # Restore in database
-    email.deleted_at = None
     db.commit()
     
     return {"success": True, "message": "Email restored from trash"}
 
-@router.delete("/{email_id}")
-async def permanently_delete_email(
-    email_id: str,
+@router.post("/restore", response_model=TrashRestoreResponse)
+def restore_emails(
+    request: TrashRestoreRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Permanently delete an email"""
-    email = db.query(EmailModel).filter(
-        EmailModel.id == email_id,
-        EmailModel.user_id == current_user.id,
-        EmailModel.deleted_at.isnot(None)
-    ).first()
+    """Restore several emails from trash"""
+    email_ids = list(dict.fromkeys(request.email_ids))
+    rows = []
+    for start in range(0, len(email_ids), BULK_CHUNK_SIZE):
+        rows += db.query(EmailModel.id, EmailModel.gmail_id).filter(
+            EmailModel.id.in_(email_ids[start:start + BULK_CHUNK_SIZE]),
+            EmailModel.user_id == current_user.id,
+            EmailModel.deleted_at.isnot(None)
+        ).all()
     
-    if not email:
-        raise HTTPException(status_code=404, detail="Trashed email not found")
+    if not rows:
+        raise HTTPException(status_code=404, detail="Trashed emails not found")
     
-    # Permanently delete from database
-    db.delete(email)
+    # Restore in Gmail with batched modify calls
+    gmail_ids = [row.gmail_id for row in rows if row.gmail_id]
+    if gmail_ids and not gmail_service.batch_restore_from_trash(current_user, gmail_ids, db):
+        raise HTTPException(status_code=500, detail="Failed to restore emails in Gmail")
+    
+    # Restore in database
+    restored_ids = [row.id for row in rows]
+    for start in range(0, len(restored_ids), BULK_CHUNK_SIZE):
+        db.execute(
+            update(EmailModel)
+            .where(EmailModel.id.in_(restored_ids[start:start + BULK_CHUNK_SIZE]))
+            .values(deleted_at=None)
+        )
     db.commit()
     
-    return {"success": True, "message": "Email permanently deleted"}
+    return TrashRestoreResponse(
+        restored_count=len(restored_ids),
+        success=True,
+        message=f"Restored {len(restored_ids)} email(s) from trash"
+    )
 
+# Registered before /{email_id} so DELETE /empty is not captured as an email id
 @router.delete("/empty", response_model=TrashEmptyResponse)
-async def empty_trash(
+def empty_trash(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Empty all trash"""
-    # Get all trashed emails
-    trashed_emails = db.query(EmailModel).filter(
+    trashed = (
         EmailModel.user_id == current_user.id,
         EmailModel.deleted_at.isnot(None)
-    ).all()
+    )
     
-    deleted_count = len(trashed_emails)
+    gmail_ids = [row.gmail_id for row in db.query(EmailModel.gmail_id).filter(
+        *trashed, EmailModel.gmail_id.isnot(None)
+    )]
     
-    # Delete all trashed emails
-    for email in trashed_emails:
-        db.delete(email)
+    # Emails that only exist locally go straight away
+    deleted_count = delete_emails_where(db, *trashed, EmailModel.gmail_id.is_(None))
     
+    # Delete in Gmail a chunk at a time and drop local rows only for chunks Gmail accepted;
+    # rows kept after a failure stay in trash instead of being re-imported by the next sync
+    kept_count = 0
+    for start in range(0, len(gmail_ids), BULK_CHUNK_SIZE):
+        chunk = gmail_ids[start:start + BULK_CHUNK_SIZE]
+        if not gmail_service.batch_delete(current_user, chunk):
+            kept_count = len(gmail_ids) - start
+            logger.error(f"Failed to delete {kept_count} email(s) in Gmail, keeping them in trash")
+            break
+        deleted_count += delete_emails_where(db, *trashed, EmailModel.gmail_id.in_(chunk))
     db.commit()
     
+    if kept_count:
+        return TrashEmptyResponse(
+            deleted_count=deleted_count,
+            success=False,
+            message=f"Permanently deleted {deleted_count} email(s); {kept_count} could not be deleted in Gmail and were kept"
+        )
     return TrashEmptyResponse(
         deleted_count=deleted_count,
         success=True,
         message=f"Permanently deleted {deleted_count} email(s)"
     )
 
-@router.post("/auto-clean")
-async def auto_clean_trash(
+@router.delete("/{email_id}")
+def permanently_delete_email(
+    email_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Auto-delete emails that have been in trash for 30+ days"""
-    cutoff_date = datetime.utcnow() - timedelta(days=30)
-    
-    # Find old trashed emails
-    old_emails = db.query(EmailModel).filter(
+    """Permanently delete an email"""
+    email = db.query(EmailModel.id, EmailModel.gmail_id).filter(
+        EmailModel.id == email_id,
         EmailModel.user_id == current_user.id,
-        EmailModel.deleted_at.isnot(None),
-        EmailModel.deleted_at < cutoff_date
-    ).all()
+        EmailModel.deleted_at.isnot(None)
+    ).first()
     
-    deleted_count = len(old_emails)
+    if not email:
+        raise HTTPException(status_code=404, detail="Trashed email not found")
     
-    # Delete old emails
-    for email in old_emails:
-        db.delete(email)
+    # Permanently delete from Gmail first; a local-only delete would be re-imported by the next sync
+    if email.gmail_id and not gmail_service.batch_delete(current_user, [email.gmail_id]):
+        raise HTTPException(status_code=500, detail="Failed to delete email in Gmail")
     
+    # Permanently delete from database
+    delete_emails_where(db, EmailModel.id == email.id)
     db.commit()
     
+    return {"success": True, "message": "Email permanently deleted"}
+
+def clean_expired_trash(user_id: Optional[str] = None) -> int:
+    """Permanently delete trash older than TRASH_RETENTION_DAYS, for one user or all users"""
+    cutoff_date = datetime.utcnow() - timedelta(days=TRASH_RETENTION_DAYS)
+    criteria = [EmailModel.deleted_at.isnot(None), EmailModel.deleted_at < cutoff_date]
+    if user_id:
+        criteria.append(EmailModel.user_id == user_id)
+    
+    db = SessionLocal()
+    try:
+        deleted_count = delete_emails_where(db, *criteria)
+        db.commit()
+        logger.info(f"Auto-cleaned {deleted_count} expired email(s) from trash")
+        return deleted_count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+@router.post("/auto-clean", status_code=202)
+def auto_clean_trash(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """Queue deletion of emails that have been in trash for 30+ days"""
+    # Expired trash is also cleaned daily for all users by the startup scheduler
+    background_tasks.add_task(clean_expired_trash, current_user.id)
+    
     return {
         "success": True,
-        "deleted_count": deleted_count,
-        "message": f"Auto-cleaned {deleted_count} old email(s) from trash"
-    }
\ No newline at end of file
+        "message": f"Auto-clean of trash older than {TRASH_RETENTION_DAYS} days scheduled"
+    }
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 import subprocess
+import shutil
 import sys
 import os
 
+SVG_PATH = '/Users/marcushansen/SAIGBOX-V3/static/saigbox-favicon.svg'
+PNG_PATH = '/Users/marcushansen/Desktop/saigbox-favicon.png'
+PREBUILT_PNG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'saigbox-favicon.png')
+# Remembers which converter worked last time so later runs try it first
+BACKEND_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.favicon_backend')
+
+# Skip the conversion entirely when the PNG is newer than the SVG
+if os.path.exists(PNG_PATH) and os.path.getmtime(PNG_PATH) >= os.path.getmtime(SVG_PATH):
+    print(f"Up to date: {PNG_PATH}")
+    sys.exit(0)
+
 # Try different methods to convert SVG to PNG
 
 def try_cairosvg():
@@ -10,8 +22,8 @@ def try_cairosvg():
     try:
         import cairosvg
         print("Using cairosvg to convert...")
-        cairosvg.svg2png(url='/Users/marcushansen/SAIGBOX-V3/static/saigbox-favicon.svg', 
-                         write_to='/Users/marcushansen/Desktop/saigbox-favicon.png',
+        cairosvg.svg2png(url=SVG_PATH, 
+                         write_to=PNG_PATH,
                          output_width=512,
                          output_height=512)
         return True
@@ -28,8 +40,8 @@ def try_pillow():
         from svglib.svglib import svg2rlg
         from reportlab.graphics import renderPM
         print("Using svglib/reportlab to convert...")
-        drawing = svg2rlg('/Users/marcushansen/SAIGBOX-V3/static/saigbox-favicon.svg')
-        renderPM.drawToFile(drawing, '/Users/marcushansen/Desktop/saigbox-favicon.png', fmt="PNG")
+        drawing = svg2rlg(SVG_PATH)
+        renderPM.drawToFile(drawing, PNG_PATH, fmt="PNG")
         return True
     except ImportError:
         print("svglib/reportlab not installed")
@@ -38,77 +50,82 @@ def try_pillow():
         print(f"svglib error: {e}")
         return False
 
+def try_resvg():
+    """Try using resvg-py (Rust bindings, renders in-process)"""
+    try:
+        import resvg_py
+        print("Using resvg-py to convert...")
+        png_bytes = resvg_py.svg_to_bytes(svg_path=SVG_PATH, width=512, height=512)
+        with open(PNG_PATH, 'wb') as f:
+            f.write(bytes(png_bytes))
+        return True
+    except ImportError:
+        print("resvg-py not installed")
+        return False
+    except Exception as e:
+        print(f"resvg-py error: {e}")
+        return False
+
 def try_rsvg():
     """Try using rsvg-convert command line tool"""
     try:
-        result = subprocess.run(['which', 'rsvg-convert'], capture_output=True, text=True)
-        if result.returncode == 0:
+        if shutil.which('rsvg-convert'):
             print("Using rsvg-convert...")
             subprocess.run([
                 'rsvg-convert', 
+                '--format', 'png',
+                '--keep-aspect-ratio',
+                '--background-color', 'none',
                 '-w', '512',
                 '-h', '512',
-                '/Users/marcushansen/SAIGBOX-V3/static/saigbox-favicon.svg',
-                '-o', '/Users/marcushansen/Desktop/saigbox-favicon.png'
-            ])
+                SVG_PATH,
+                '-o', PNG_PATH
+            ], check=True)
             return True
     except:
         pass
     return False
 
-def create_png_manually():
-    """Create a simple PNG representation using PIL"""
-    try:
-        from PIL import Image, ImageDraw
-        print("Creating PNG manually with PIL...")
-        
-        # Create a 512x512 image with transparent background
-        img = Image.new('RGBA', (512, 512), (255, 255, 255, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Draw a green leaf shape (simplified)
-        # This is a simplified representation of the leaf
-        leaf_color = (127, 201, 127, 255)  # #7fc97f with full opacity
-        
-        # Draw main leaf body (ellipse)
-        draw.ellipse([100, 50, 400, 350], fill=leaf_color)
-        
-        # Draw leaf stem
-        draw.rectangle([240, 350, 270, 450], fill=leaf_color)
-        
-        # Add some leaf veins
-        draw.line([(256, 100), (256, 350)], fill=(100, 175, 100, 255), width=3)
-        draw.line([(200, 150), (256, 200)], fill=(100, 175, 100, 255), width=2)
-        draw.line([(312, 150), (256, 200)], fill=(100, 175, 100, 255), width=2)
-        draw.line([(200, 250), (256, 300)], fill=(100, 175, 100, 255), width=2)
-        draw.line([(312, 250), (256, 300)], fill=(100, 175, 100, 255), width=2)
-        
-        # Save the image
-        img.save('/Users/marcushansen/Desktop/saigbox-favicon.png', 'PNG')
-        return True
-    except ImportError:
-        print("PIL/Pillow not installed")
-        return False
-    except Exception as e:
-        print(f"PIL error: {e}")
+def use_prebuilt_png():
+    """Copy the prebuilt PNG shipped in static/ (see scripts/build_favicon.py)"""
+    if not os.path.exists(PREBUILT_PNG_PATH):
+        print("Prebuilt PNG not found; run scripts/build_favicon.py")
         return False
+    print("Using prebuilt static/saigbox-favicon.png...")
+    shutil.copyfile(PREBUILT_PNG_PATH, PNG_PATH)
+    return True
 
-# Try different methods in order of preference
-if not try_cairosvg():
-    if not try_rsvg():
-        if not try_pillow():
-            if not create_png_manually():
-                print("Unable to convert SVG to PNG")
-                print("\nTo convert manually, you can:")
-                print("1. Install cairosvg: pip install cairosvg")
-                print("2. Or install rsvg: brew install librsvg")
-                print("3. Or use an online converter")
-                sys.exit(1)
+# Try different methods in order of preference, last successful one first
+converters = [
+    ('resvg', try_resvg),
+    ('rsvg', try_rsvg),
+    ('cairosvg', try_cairosvg),
+    ('svglib', try_pillow),
+    ('prebuilt', use_prebuilt_png),
+]
+if os.path.exists(BACKEND_CACHE):
+    with open(BACKEND_CACHE) as f:
+        cached_backend = f.read().strip()
+    converters.sort(key=lambda converter: converter[0] != cached_backend)
+
+for name, convert in converters:
+    if convert():
+        with open(BACKEND_CACHE, 'w') as f:
+            f.write(name)
+        break
+else:
+    print("Unable to convert SVG to PNG")
+    print("\nTo convert manually, you can:")
+    print("1. Install resvg-py: pip install resvg-py")
+    print("2. Or install rsvg: brew install librsvg")
+    print("3. Or install cairosvg: pip install cairosvg")
+    print("4. Or use an online converter")
+    sys.exit(1)
 
-if os.path.exists('/Users/marcushansen/Desktop/saigbox-favicon.png'):
-    print("\n✅ Successfully created: ~/Desktop/saigbox-favicon.png")
+if os.path.exists(PNG_PATH):
+    print(f"\n✅ Successfully created: {PNG_PATH}")
     # Get file size
-    size = os.path.getsize('/Users/marcushansen/Desktop/saigbox-favicon.png')
+    size = os.path.getsize(PNG_PATH)
     print(f"File size: {size:,} bytes")
 else:
     print("❌ Failed to create PNG file")
\ No newline at end of file
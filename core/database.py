@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Boolean, Integer, ForeignKey, JSON
+from sqlalchemy import create_engine, event, select, update, delete, Column, String, Text, DateTime, Boolean, Integer, SmallInteger, ForeignKey, JSON, UniqueConstraint, CheckConstraint, Index, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, StaticPool
 from datetime import datetime
 import uuid
 import os
@@ -10,7 +12,40 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///saigbox.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Connection pool sized for concurrent FastAPI workers; pre-ping drops dead connections
+engine_options = {
+    "poolclass": QueuePool,
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+}
+if DATABASE_URL.startswith("postgresql"):
+    engine_options["pool_use_lifo"] = True  # Reuse the most recently returned (warm) connection
+elif DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+    # In-memory SQLite (tests/scripts) lives in one connection; share it across threads
+    engine_options = {"poolclass": StaticPool}
+
+# check_same_thread is a sqlite3-only option; other drivers reject it
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **engine_options)
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        # WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+        cursor = dbapi_conn.cursor()
+        for pragma in (
+            "journal_mode=WAL",
+            "synchronous=NORMAL",
+            "temp_store=MEMORY",
+            "mmap_size=268435456",  # 256 MB
+            "cache_size=-65536",  # 64 MB
+        ):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -21,6 +56,12 @@ def get_db():
     finally:
         db.close()
 
+def dialect_insert(model):
+    """INSERT construct for the active dialect (supports ON CONFLICT clauses)"""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -41,6 +82,9 @@ class User(Base):
     refresh_token = Column(Text)
     token_expiry = Column(DateTime)
     
+    # Gmail historyId the last sync reached; drives incremental history.list syncs
+    last_history_id = Column(String, nullable=True)
+    
     # Timestamps
     last_login = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -52,6 +96,17 @@ class User(Base):
 
 class Email(Base):
     __tablename__ = "emails"
+    __table_args__ = (
+        # Mailbox listings filter by user and trash state, newest first
+        Index("ix_emails_user_deleted_received", "user_id", "deleted_at", "received_at"),
+        # Partial index holding only trashed rows, for the trash endpoints
+        Index(
+            "ix_emails_trashed", "user_id", "received_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL")
+        ),
+        CheckConstraint("urgency_score BETWEEN 0 AND 100", name="ck_emails_urgency_score"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -60,27 +115,28 @@ class Email(Base):
     subject = Column(String)
     sender = Column(String)
     sender_name = Column(String)
-    recipients = Column(JSON)
-    cc = Column(JSON)
-    bcc = Column(JSON)
+    recipients = Column(JSON, nullable=False, default=list, server_default='[]')
+    cc = Column(JSON, nullable=False, default=list, server_default='[]')
+    bcc = Column(JSON, nullable=False, default=list, server_default='[]')
     body_text = Column(Text)
     body_html = Column(Text)
     snippet = Column(Text)
-    labels = Column(JSON)
+    labels = Column(JSON, nullable=False, default=list, server_default='[]')
+    category = Column(String, nullable=True, index=True)  # Set once categorized (mirrors CATEGORY/* label)
     is_read = Column(Boolean, default=False)
     is_starred = Column(Boolean, default=False)
     has_attachments = Column(Boolean, default=False)
-    attachments = Column(JSON)
+    attachments = Column(JSON, nullable=False, default=list, server_default='[]')
     received_at = Column(DateTime)
-    deleted_at = Column(DateTime, nullable=True)
+    deleted_at = Column(DateTime, nullable=True, index=True)  # Standalone index for cross-user trash expiry
     
     # Urgency fields
     is_urgent = Column(Boolean, default=False, index=True)
-    urgency_score = Column(Integer, default=0)  # 0-100 scale
+    urgency_score = Column(SmallInteger, default=0)  # 0-100 scale
     urgency_reason = Column(String)  # Why it was marked urgent
     urgency_analyzed_at = Column(DateTime, nullable=True)
     auto_actions_created = Column(Boolean, default=False)
-    action_count = Column(Integer, default=0)
+    action_count = Column(SmallInteger, default=0)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -90,6 +146,9 @@ class Email(Base):
 
 class ActionItem(Base):
     __tablename__ = "action_items"
+    __table_args__ = (
+        CheckConstraint("priority BETWEEN 1 AND 3", name="ck_action_items_priority"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -97,10 +156,10 @@ class ActionItem(Base):
     title = Column(String, nullable=False)
     description = Column(Text)
     due_date = Column(DateTime, nullable=True)
-    priority = Column(Integer, default=2)  # 1=High, 2=Medium, 3=Low
+    priority = Column(SmallInteger, default=2)  # 1=High, 2=Medium, 3=Low
     status = Column(String, default="pending")  # pending, completed, overdue
     auto_created = Column(Boolean, default=False)  # True if created by AI
-    confidence_score = Column(Integer, nullable=True)  # AI confidence 0-100
+    confidence_score = Column(SmallInteger, nullable=True)  # AI confidence 0-100
     source_quote = Column(Text, nullable=True)  # Text that triggered this action
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
@@ -127,6 +186,9 @@ class Huddle(Base):
 
 class HuddleMember(Base):
     __tablename__ = "huddle_members"
+    __table_args__ = (
+        UniqueConstraint("huddle_id", "user_email", name="uq_huddle_members_huddle_user"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     huddle_id = Column(String, ForeignKey("huddles.id"), nullable=False)
@@ -138,6 +200,9 @@ class HuddleMember(Base):
 
 class HuddleMessage(Base):
     __tablename__ = "huddle_messages"
+    __table_args__ = (
+        Index("ix_hmsg_huddle_created", "huddle_id", "created_at"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     huddle_id = Column(String, ForeignKey("huddles.id"), nullable=False)
@@ -149,6 +214,9 @@ class HuddleMessage(Base):
 
 class HuddleEmail(Base):
     __tablename__ = "huddle_emails"
+    __table_args__ = (
+        UniqueConstraint("huddle_id", "email_id", name="uq_huddle_emails_huddle_email"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     huddle_id = Column(String, ForeignKey("huddles.id"), nullable=False)
@@ -160,6 +228,9 @@ class HuddleEmail(Base):
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        Index("ix_chathist_user_created", "user_id", "created_at"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -183,5 +254,17 @@ class UrgencyPattern(Base):
     
     user = relationship("User")
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+def init_db():
+    """Create any missing tables; run once at startup rather than on import"""
+    Base.metadata.create_all(bind=engine)
+
+def delete_emails_where(db: Session, *criteria) -> int:
+    """Permanently delete matching emails and their dependent rows; returns the rowcount"""
+    # Matching ids stay in the database as a subquery instead of round-tripping through Python
+    matching_ids = select(Email.id).where(*criteria)
+    # Action items outlive their email (same as the ORM's nullify-on-delete)
+    db.execute(
+        update(ActionItem).where(ActionItem.email_id.in_(matching_ids)).values(email_id=None)
+    )
+    db.execute(delete(HuddleEmail).where(HuddleEmail.email_id.in_(matching_ids)))
+    return db.execute(delete(Email).where(*criteria)).rowcount
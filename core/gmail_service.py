@@ -1,19 +1,88 @@
 import os
-import base64
-from datetime import datetime
+import binascii
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.header import Header
+from email.headerregistry import Address
+from email.errors import HeaderParseError
+from email.utils import getaddresses, formataddr, parseaddr
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
+from google_auth_httplib2 import AuthorizedHttp
+from google.auth.transport.requests import Request
+from sqlalchemy import Row, case, func, update
+import orjson
 from sqlalchemy.orm import Session
 import logging
 
-from core.database import Email, User
+try:
+    import pybase64 as base64  # SIMD-accelerated drop-in for the stdlib module
+except ImportError:
+    import base64
+
+from core.database import Email, User, dialect_insert, delete_emails_where
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Max message ids per batchDelete / batchModify call
+GMAIL_BATCH_LIMIT = 1000
+# Sub-requests per HTTP batch; Gmail allows 100 but throttles batches above 50
+GMAIL_HTTP_BATCH_SIZE = 50
+# Partial-response mask covering exactly what _parse_email reads (drops part headers, sizeEstimate, ...)
+MESSAGE_PART_FIELDS = 'filename,mimeType,body(size,attachmentId,data)'
+FULL_MESSAGE_FIELDS = (
+    'id,threadId,labelIds,snippet,internalDate,'
+    'payload(mimeType,headers,body/data,'
+    # Three part levels cover mixed > related > alternative, the usual HTML-with-inline-images layout
+    f'parts({MESSAGE_PART_FIELDS},parts({MESSAGE_PART_FIELDS},parts({MESSAGE_PART_FIELDS}))))'
+)
+LIST_FIELDS = 'messages/id,nextPageToken,resultSizeEstimate'
+METADATA_MESSAGE_FIELDS = 'id,threadId,labelIds,snippet,internalDate,payload/headers'
+HISTORY_FIELDS = (
+    'history(messagesAdded/message(id,labelIds),labelsAdded/message(id,labelIds),'
+    'labelsRemoved/message(id,labelIds),messagesDeleted/message/id),historyId,nextPageToken'
+)
+# Headers the parsers read, matched case-insensitively ('Cc' vs 'CC')
+PARSED_HEADERS = frozenset({'subject', 'from', 'to', 'cc', 'bcc'})
+REPLY_HEADERS = frozenset({'message-id'})
+# Columns fetch_emails reports back for each synced message
+SYNC_RESULT_COLUMNS = (Email.id, Email.gmail_id, Email.subject, Email.labels, Email.deleted_at, Email.received_at)
+# Messages fetched, parsed and upserted together during a sync
+SYNC_CHUNK_SIZE = 100
+# Concurrent single-message fetches for ids a batch didn't return
+MAX_FETCH_WORKERS = 10
+# execute(num_retries=...) retries 429/5xx with randomized exponential backoff; used on every call except send
+GMAIL_NUM_RETRIES = 5
+# Built services kept per thread (~400 KiB each), least recently used evicted first
+SERVICE_CACHE_SIZE = 4
+# Refresh cached credentials this long before they expire
+TOKEN_REFRESH_MARGIN = timedelta(seconds=120)
+# Naive UTC epoch; internalDate is converted with integer arithmetic, no local-time lookup
+UNIX_EPOCH = datetime(1970, 1, 1)
+# How long a user's label name -> id map is reused before labels.list is called again
+LABEL_CACHE_TTL = timedelta(minutes=10)
+# RFC 2045 caps base64 body lines at 76 characters
+MIME_BASE64_LINE_LENGTH = 76
+
+class OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson instead of the stdlib json module"""
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
 class GmailService:
     def __init__(self):
         # OAuth app credentials for token refresh (uses GOOGLE_ prefix, falls back to GMAIL_)
@@ -30,6 +99,13 @@ class GmailService:
             'openid',
             'https://mail.google.com/'
         ]
+        # Built services per user, a small LRU per thread because httplib2 connections aren't thread-safe
+        self._local = threading.local()
+        # Latest refreshed (token, expiry) per user, shared by all threads; refreshes are single-flight per user
+        self._fresh_tokens: Dict[str, tuple] = {}
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        # Per-user (fetched_at, {label name: id})
+        self._label_cache: Dict[str, tuple] = {}
     
     def create_service_from_tokens(self, access_token: str, refresh_token: str = None):
         """Create Gmail service directly from OAuth tokens"""
@@ -42,7 +118,10 @@ class GmailService:
             scopes=self.scopes
         )
         
-        return build('gmail', 'v1', credentials=credentials)
+        return build(
+            'gmail', 'v1', credentials=credentials, model=OrjsonModel(),
+            static_discovery=True, cache_discovery=False
+        )
     
     def fetch_recent_emails(self, user: User, limit: int = 50) -> List[Dict]:
         """Fetch recent emails from Gmail - stub implementation"""
@@ -51,42 +130,81 @@ class GmailService:
         return []
     
     def get_service(self, user: User):
-        """Get Gmail service using user's OAuth tokens"""
+        """Get Gmail service using user's OAuth tokens, reusing the one built for this thread"""
         # Use OAuth tokens from the user's OAuth flow
         if user.oauth_access_token:
             # User authenticated via OAuth (Google/Microsoft)
             access_token = user.oauth_access_token
             refresh_token = user.oauth_refresh_token
-            logger.info(f"Using OAuth tokens for user {user.email}")
+            expiry = user.oauth_token_expires
         elif user.access_token:
             # Legacy support
             access_token = user.access_token
             refresh_token = user.refresh_token
-            logger.info(f"Using legacy tokens for user {user.email}")
+            expiry = user.token_expiry
         else:
             logger.error(f"User {user.email} has no access token")
             raise ValueError("User has no access token. Please re-authenticate.")
         
-        credentials = Credentials(
-            token=access_token,
-            refresh_token=refresh_token,
-            token_uri=self.token_uri,
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            scopes=self.scopes
-        )
+        # Cached entries are keyed on the stored token they were built from
+        services = self._services()
+        cached = services.get(user.id)
+        if cached and cached[1] == access_token:
+            service, _, credentials = cached
+        else:
+            logger.info(f"Building Gmail service for user {user.email}")
+            credentials = Credentials(
+                token=access_token,
+                refresh_token=refresh_token,
+                token_uri=self.token_uri,
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                scopes=self.scopes,
+                expiry=expiry
+            )
+            # Bundled discovery document: no network fetch when building a service
+            service = build(
+                'gmail', 'v1', credentials=credentials, model=OrjsonModel(),
+                static_discovery=True, cache_discovery=False
+            )
         
-        # Check if token needs refresh
-        if credentials.expired and credentials.refresh_token:
-            from google.auth.transport.requests import Request
-            credentials.refresh(Request())
+        # Refresh shortly before expiry so in-flight calls don't hit a 401
+        if credentials.refresh_token and self._expires_soon(credentials.expiry):
+            self._refresh_credentials(user, credentials)
             
             # Update stored tokens
-            user.oauth_access_token = credentials.token
+            user.oauth_access_token = access_token = credentials.token
             if credentials.expiry:
                 user.oauth_token_expires = credentials.expiry
         
-        return build('gmail', 'v1', credentials=credentials)
+        services[user.id] = (service, access_token, credentials)
+        services.move_to_end(user.id)
+        while len(services) > SERVICE_CACHE_SIZE:
+            services.popitem(last=False)
+        return service
+    
+    def invalidate_service(self, user: User):
+        """Drop this thread's cached service for the user (e.g. after a 401)"""
+        self._services().pop(user.id, None)
+        self._fresh_tokens.pop(user.id, None)
+    
+    def _expires_soon(self, expiry: Optional[datetime]) -> bool:
+        return bool(expiry) and expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN
+    
+    def _refresh_credentials(self, user: User, credentials: Credentials):
+        """Refresh under a per-user lock, adopting a token another thread already refreshed"""
+        with self._refresh_locks.setdefault(user.id, threading.Lock()):
+            fresh = self._fresh_tokens.get(user.id)
+            if fresh and not self._expires_soon(fresh[1]):
+                credentials.token, credentials.expiry = fresh
+                return
+            credentials.refresh(Request())
+            self._fresh_tokens[user.id] = (credentials.token, credentials.expiry)
+    
+    def _services(self) -> 'OrderedDict[str, tuple]':
+        if not hasattr(self._local, 'services'):
+            self._local.services = OrderedDict()
+        return self._local.services
     
     def fetch_emails(self, db: Session, user: User, max_results: int = 50, page_token: str = None) -> Dict[str, Any]:
         """Primary email sync method with retry logic"""
@@ -99,80 +217,114 @@ class GmailService:
                 service = self.get_service(user)
                 logger.info(f"Gmail service created successfully for {user.email}")
                 
-                # Get last sync token if exists (for incremental sync)
-                last_history_id = getattr(user, 'last_history_id', None) if not page_token else None
-                
-                # Fetch messages including trash to maintain sync
-                # We'll handle spam exclusion but include trash for proper synchronization
-                query = '-in:spam'  # Exclude only spam, include trash for sync
-                
-                logger.info(f"Calling Gmail API with query: {query}, maxResults: {max_results}")
-                results = service.users().messages().list(
-                    userId='me',
-                    maxResults=max_results,
-                    pageToken=page_token,
-                    q=query
-                ).execute()
+                # Incremental sync from the stored history checkpoint, unless paging a full listing
+                history_id = None
+                changes = None
+                if user.last_history_id and not page_token:
+                    changes = self._list_history_changes(service, user.last_history_id)
                 
-                messages = results.get('messages', [])
-                next_page_token = results.get('nextPageToken')
-                logger.info(f"Gmail API returned {len(messages)} messages, next_page_token: {next_page_token if next_page_token else 'None'}")
-                logger.info(f"Total result size estimate: {results.get('resultSizeEstimate', 'unknown')}")
-                emails = []
+                label_rows = []
+                if changes is not None:
+                    message_ids, label_changes, deleted_ids, history_id = changes
+                    if deleted_ids:
+                        # Permanently deleted in Gmail: nothing left to restore, so drop them locally too
+                        for start in range(0, len(deleted_ids), SYNC_CHUNK_SIZE):
+                            delete_emails_where(
+                                db, Email.user_id == user.id,
+                                Email.gmail_id.in_(deleted_ids[start:start + SYNC_CHUNK_SIZE])
+                            )
+                    # Label-only changes to stored messages come straight from the history records;
+                    # only new or not-yet-stored messages are fetched
+                    stored_ids = self._stored_gmail_ids(db, user, list(label_changes))
+                    for gmail_id, label_ids in label_changes.items():
+                        if gmail_id in stored_ids:
+                            label_rows.append(self._parse_label_state(gmail_id, label_ids))
+                        else:
+                            message_ids.append(gmail_id)
+                    messages = [{'id': message_id} for message_id in message_ids]
+                    next_page_token = None
+                    results = {'resultSizeEstimate': len(messages)}
+                    logger.info(
+                        f"Incremental sync since history {user.last_history_id}: "
+                        f"{len(messages)} message(s) to fetch, {len(label_rows)} label update(s), "
+                        f"{len(deleted_ids)} deletion(s)"
+                    )
+                else:
+                    # A full listing starts a new checkpoint from the current mailbox state
+                    if not page_token:
+                        history_id = service.users().getProfile(userId='me', fields='historyId').execute(
+                            num_retries=GMAIL_NUM_RETRIES
+                        ).get('historyId')
+                    
+                    # Fetch messages including trash to maintain sync
+                    # We'll handle spam exclusion but include trash for proper synchronization
+                    query = '-in:spam'  # Exclude only spam, include trash for sync
+                    
+                    logger.info(f"Calling Gmail API with query: {query}, maxResults: {max_results}")
+                    results = service.users().messages().list(
+                        userId='me',
+                        maxResults=max_results,
+                        pageToken=page_token,
+                        q=query,
+                        fields=LIST_FIELDS
+                    ).execute(num_retries=GMAIL_NUM_RETRIES)
+                    
+                    messages = results.get('messages', [])
+                    next_page_token = results.get('nextPageToken')
+                    logger.info(f"Gmail API returned {len(messages)} messages, next_page_token: {next_page_token if next_page_token else 'None'}")
+                    logger.info(f"Total result size estimate: {results.get('resultSizeEstimate', 'unknown')}")
                 failed_count = 0
+                # Messages Gmail couldn't return (other than 404); the history checkpoint must not pass them
+                unfetched_count = 0
                 
-                for msg in messages:
-                    try:
-                        # Get full message details with retry
-                        message = self._fetch_message_with_retry(service, msg['id'])
-                        if not message:
-                            failed_count += 1
-                            continue
-                        
-                        # Parse email
-                        email_data = self._parse_email(message)
-                        
-                        # Save or update in database
-                        existing = db.query(Email).filter(
-                            Email.gmail_id == email_data['gmail_id'],
-                            Email.user_id == user.id
-                        ).first()
-                        
-                        if existing:
-                            # Update email data including trash status
-                            # Check if trash status has changed
-                            is_trashed = 'TRASH' in email_data.get('labels', [])
-                            
-                            # Update deleted_at based on current Gmail trash status
-                            if is_trashed and not existing.deleted_at:
-                                # Email was moved to trash in Gmail
-                                existing.deleted_at = datetime.utcnow()
-                                logger.info(f"Email {existing.gmail_id} moved to trash in Gmail, syncing to SAIGBOX")
-                            elif not is_trashed and existing.deleted_at:
-                                # Email was restored from trash in Gmail
-                                existing.deleted_at = None
-                                logger.info(f"Email {existing.gmail_id} restored from trash in Gmail, syncing to SAIGBOX")
+                emails = self._upsert_emails(db, user, label_rows)
+                
+                # Fetch, parse and upsert a chunk at a time so only one chunk of raw messages is held in memory
+                message_ids = [msg['id'] for msg in messages]
+                for start in range(0, len(message_ids), SYNC_CHUNK_SIZE):
+                    chunk_ids = message_ids[start:start + SYNC_CHUNK_SIZE]
+                    
+                    # Fetch full messages in HTTP batches instead of one round-trip each
+                    fetched = self._batch_get_messages(
+                        service, chunk_ids, format='full', fields=FULL_MESSAGE_FIELDS
+                    )
+                    
+                    # Retry anything the batch didn't return with overlapping single fetches
+                    missing_ids = [message_id for message_id in chunk_ids if message_id not in fetched]
+                    if missing_ids:
+                        credentials = self._services()[user.id][2]
+                        fetched.update(self._fetch_messages_concurrently(service, credentials, missing_ids))
+                    
+                    rows = []
+                    for message_id in chunk_ids:
+                        try:
+                            message = fetched.pop(message_id, None)
+                            if message is None:
+                                failed_count += 1
+                                unfetched_count += 1
+                                continue
+                            if not message:
+                                continue  # Deleted in Gmail since it was listed
                             
-                            # Update other fields
-                            for key, value in email_data.items():
-                                if key != 'deleted_at':  # Don't override our logic above
-                                    setattr(existing, key, value)
+                            rows.append(self._parse_email(message))
                             
-                            email_obj = existing
-                        else:
-                            email_obj = Email(user_id=user.id, **email_data)
-                            db.add(email_obj)
-                        
-                        emails.append(email_obj)
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing email {msg['id']}: {e}")
-                        failed_count += 1
-                        if failed_count > 5:  # Too many failures, use fallback
-                            logger.warning("Too many failures, switching to fallback sync")
-                            return self._fallback_sync(db, user, messages, service)
-                        continue
+                        except Exception as e:
+                            logger.error(f"Error processing email {message_id}: {e}")
+                            failed_count += 1
+                            if failed_count > 5:  # Too many failures, use fallback
+                                logger.warning("Too many failures, switching to fallback sync")
+                                self._upsert_emails(db, user, rows)
+                                return self._fallback_sync(db, user, messages, service)
+                            continue
+                    
+                    # Insert new rows and refresh synced ones in a single statement per chunk
+                    emails += self._upsert_emails(db, user, rows)
                 
+                if history_id and not unfetched_count:
+                    user.last_history_id = str(history_id)
+                elif history_id:
+                    # Keep the old checkpoint so the next sync lists these changes again
+                    logger.warning(f"{unfetched_count} message(s) could not be fetched, not advancing history checkpoint")
                 db.commit()
                 
                 result = {
@@ -185,26 +337,27 @@ class GmailService:
                 return result
                 
             except HttpError as e:
+                # Drop this attempt's upserts with its history checkpoint; a partial sync is never committed
+                db.rollback()
                 if e.resp.status == 401:  # Token expired
                     logger.info(f"Token expired, refreshing... (attempt {retry_count + 1})")
                     try:
                         # Force token refresh
+                        self.invalidate_service(user)
                         service = self.get_service(user)
                         retry_count += 1
                         continue
                     except Exception as refresh_error:
                         logger.error(f"Token refresh failed: {refresh_error}")
                         raise
-                elif e.resp.status == 429:  # Rate limit
-                    logger.warning(f"Rate limited, waiting before retry... (attempt {retry_count + 1})")
-                    import time
-                    time.sleep(2 ** retry_count)  # Exponential backoff
-                    retry_count += 1
-                    continue
+                elif e.resp.status == 429:  # Still rate limited after execute()'s own backoff
+                    logger.warning("Rate limited after retries, serving cached emails")
+                    return self._fallback_basic_sync(db, user)
                 else:
                     logger.error(f"Gmail API error: {e}")
                     raise
             except Exception as e:
+                db.rollback()
                 logger.error(f"Error fetching emails (attempt {retry_count + 1}): {e}")
                 retry_count += 1
                 if retry_count >= max_retries:
@@ -215,69 +368,209 @@ class GmailService:
         logger.error("All retry attempts failed")
         return self._fallback_basic_sync(db, user)
     
-    def _fetch_message_with_retry(self, service, message_id: str, max_retries: int = 2):
-        """Fetch individual message with retry logic"""
-        for attempt in range(max_retries):
+    def _batch_get_messages(self, service, message_ids: List[str], **get_kwargs) -> Dict[str, Dict[str, Any]]:
+        """Fetch messages through Gmail HTTP batch requests, keyed by id; failed ids (or whole failed batches) are omitted"""
+        fetched = {}
+        
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.warning(f"Batch fetch failed for message {request_id}: {exception}")
+            else:
+                fetched[request_id] = response
+        
+        message_ids = list(dict.fromkeys(message_ids))  # Batch request ids must be unique
+        for start in range(0, len(message_ids), GMAIL_HTTP_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for message_id in message_ids[start:start + GMAIL_HTTP_BATCH_SIZE]:
+                batch.add(
+                    service.users().messages().get(userId='me', id=message_id, **get_kwargs),
+                    request_id=message_id
+                )
             try:
-                return service.users().messages().get(
-                    userId='me',
-                    id=message_id
-                ).execute()
+                batch.execute()
             except Exception as e:
-                if attempt < max_retries - 1:
-                    import time
-                    time.sleep(0.5)  # Brief pause before retry
-                    continue
-                logger.error(f"Failed to fetch message {message_id}: {e}")
-                return None
-        return None
+                if isinstance(e, HttpError) and e.resp.status == 401:
+                    raise  # let fetch_emails refresh the token and retry
+                logger.warning(f"Batch request failed, leaving its messages to single fetches: {e}")
+        
+        return fetched
+    
+    def _list_history_changes(self, service, start_history_id: str) -> Optional[tuple]:
+        """Return (added message ids, {id: labelIds} for label-only changes, deleted message ids,
+        latest historyId) since start_history_id, or None if it expired"""
+        message_ids = {}
+        label_changes = {}
+        deleted_ids = {}
+        history_id = start_history_id
+        page_token = None
+        
+        while True:
+            try:
+                response = service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    historyTypes=['messageAdded', 'labelAdded', 'labelRemoved', 'messageDeleted'],
+                    pageToken=page_token,
+                    fields=HISTORY_FIELDS
+                ).execute(num_retries=GMAIL_NUM_RETRIES)
+            except HttpError as e:
+                if e.resp.status == 404:  # Checkpoint too old; caller falls back to a full listing
+                    logger.info(f"History {start_history_id} expired, running full sync")
+                    return None
+                raise
+            
+            for record in response.get('history', []):
+                for change in record.get('messagesDeleted', []):
+                    deleted_ids[change['message']['id']] = None
+                for key in ('messagesAdded', 'labelsAdded', 'labelsRemoved'):
+                    for change in record.get(key, []):
+                        message = change['message']
+                        label_ids = message.get('labelIds', [])
+                        if 'SPAM' in label_ids:
+                            continue
+                        if key == 'messagesAdded':
+                            message_ids[message['id']] = None
+                        else:
+                            # Records are oldest first, so the last one seen holds the current labels
+                            label_changes[message['id']] = label_ids
+            
+            history_id = response.get('historyId', history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                for message_id in deleted_ids:
+                    message_ids.pop(message_id, None)
+                    label_changes.pop(message_id, None)
+                for message_id in message_ids:
+                    label_changes.pop(message_id, None)
+                return list(message_ids), label_changes, list(deleted_ids), history_id
+    
+    def _upsert_emails(self, db: Session, user: User, rows: List[Dict[str, Any]]) -> List[Row]:
+        """Insert or refresh parsed emails with one ON CONFLICT (gmail_id) statement.
+        
+        Returns plain rows of SYNC_RESULT_COLUMNS rather than ORM objects, so nothing is tracked by the session.
+        """
+        if not rows:
+            return []
+        stmt = dialect_insert(Email)
+        updated = {key: stmt.excluded[key] for key in rows[0] if key not in ('gmail_id', 'deleted_at')}
+        # Follow Gmail's trash state but keep the original trash time while it stays trashed
+        updated['deleted_at'] = case(
+            (stmt.excluded.deleted_at.is_(None), None),
+            else_=func.coalesce(Email.deleted_at, stmt.excluded.deleted_at)
+        )
+        # set_ bypasses the column's onupdate
+        updated['updated_at'] = datetime.utcnow()
+        # gmail_id is unique across users; never let one user's sync overwrite another user's row
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Email.gmail_id],
+            set_=updated,
+            where=(Email.user_id == stmt.excluded.user_id)
+        ).returning(*SYNC_RESULT_COLUMNS)
+        synced = db.execute(stmt, [{'user_id': user.id, **row} for row in rows]).all()
+        if len(synced) < len(rows):
+            logger.warning(f"Skipped {len(rows) - len(synced)} message(s) already stored for another user")
+        return synced
+    
+    def _stored_gmail_ids(self, db: Session, user: User, gmail_ids: List[str]) -> set:
+        """Which of gmail_ids the user already has stored, in one IN query"""
+        if not gmail_ids:
+            return set()
+        return {
+            gmail_id for (gmail_id,) in db.query(Email.gmail_id).filter(
+                Email.user_id == user.id,
+                Email.gmail_id.in_(gmail_ids)
+            )
+        }
+    
+    def _fetch_messages_concurrently(self, service, credentials, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch messages one request each on a thread pool; failed ids are omitted, deleted ones map to {}"""
+        local = threading.local()
+        
+        def fetch(message_id):
+            # httplib2 isn't thread-safe, so each worker gets its own authorized connection
+            if not hasattr(local, 'http'):
+                local.http = AuthorizedHttp(credentials, http=build_http())
+            return message_id, self._fetch_message_with_retry(service, message_id, http=local.http)
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(message_ids))) as executor:
+            return {
+                message_id: message
+                for message_id, message in executor.map(fetch, message_ids)
+                if message is not None
+            }
+    
+    def _fetch_message_with_retry(self, service, message_id: str, http=None):
+        """Fetch an individual message; 429/5xx responses are retried with backoff by googleapiclient.
+        
+        Returns None on failure and {} if the message no longer exists (404).
+        """
+        try:
+            return service.users().messages().get(
+                userId='me',
+                id=message_id,
+                format='full',
+                fields=FULL_MESSAGE_FIELDS
+            ).execute(http=http, num_retries=GMAIL_NUM_RETRIES)
+        except HttpError as e:
+            if e.resp.status == 404:
+                logger.info(f"Message {message_id} no longer exists in Gmail")
+                return {}
+            logger.error(f"Failed to fetch message {message_id}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to fetch message {message_id}: {e}")
+            return None
+    
+    def hydrate_body(self, db: Session, user: User, email: Email) -> bool:
+        """Fetch and store the body of an email that was synced from metadata only"""
+        try:
+            message = self._fetch_message_with_retry(self.get_service(user), email.gmail_id)
+            if not message:
+                return False
+            payload = message.get('payload', {})
+            email.body_text, email.body_html = self._get_body(payload)
+            email.attachments = self._get_attachments(payload)
+            email.has_attachments = bool(email.attachments)
+            db.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error loading body for email {email.gmail_id}: {e}")
+            db.rollback()
+            return False
     
     def _fallback_sync(self, db: Session, user: User, messages: list, service) -> Dict[str, Any]:
         """Fallback sync method for partial failures"""
         logger.info("Using fallback sync method")
-        emails = []
+        messages = messages[:20]  # Limit to 20 for fallback
+        
+        # Get only metadata, not full messages (lighter weight), in one batch
+        try:
+            fetched = self._batch_get_messages(
+                service,
+                [msg['id'] for msg in messages],
+                format='metadata',
+                metadataHeaders=['From', 'To', 'Subject', 'Date'],
+                fields=METADATA_MESSAGE_FIELDS
+            )
+        except Exception as e:
+            logger.error(f"Fallback batch fetch failed: {e}")
+            fetched = {}
         
-        # Process only message headers (lighter weight)
-        for msg in messages[:20]:  # Limit to 20 for fallback
+        rows = []
+        for msg in messages:
             try:
-                # Get only metadata, not full message
-                message = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='metadata',
-                    metadataHeaders=['From', 'To', 'Subject', 'Date']
-                ).execute()
+                message = fetched.get(msg['id'])
+                if not message:
+                    continue
                 
                 # Create minimal email record
-                email_data = self._parse_minimal_email(message)
-                
-                existing = db.query(Email).filter(
-                    Email.gmail_id == email_data['gmail_id'],
-                    Email.user_id == user.id
-                ).first()
-                
-                if existing:
-                    # Update trash status for existing emails
-                    is_trashed = 'TRASH' in email_data.get('labels', [])
-                    if is_trashed and not existing.deleted_at:
-                        existing.deleted_at = datetime.utcnow()
-                    elif not is_trashed and existing.deleted_at:
-                        existing.deleted_at = None
-                    
-                    # Update other fields
-                    for key, value in email_data.items():
-                        if key != 'deleted_at':
-                            setattr(existing, key, value)
-                    emails.append(existing)
-                else:
-                    email_obj = Email(user_id=user.id, **email_data)
-                    db.add(email_obj)
-                    emails.append(email_obj)
+                rows.append(self._parse_minimal_email(message))
                     
             except Exception as e:
                 logger.error(f"Fallback sync error for {msg['id']}: {e}")
                 continue
         
+        emails = self._upsert_emails(db, user, rows)
         db.commit()
         
         return {
@@ -291,8 +584,8 @@ class GmailService:
         """Most basic fallback - return existing emails from database"""
         logger.warning("Using basic fallback - returning cached emails")
         
-        # Return most recent emails from database (including trashed for sync purposes)
-        emails = db.query(Email).filter(
+        # Return most recent emails from database (including trashed for sync purposes), same columns as a sync
+        emails = db.query(*SYNC_RESULT_COLUMNS).filter(
             Email.user_id == user.id
         ).order_by(Email.received_at.desc()).limit(50).all()
         
@@ -306,13 +599,9 @@ class GmailService:
     
     def _parse_minimal_email(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Parse minimal email data from metadata"""
-        headers = {}
-        if 'payload' in message and 'headers' in message['payload']:
-            headers = {h['name']: h['value'] for h in message['payload']['headers']}
+        headers = self._header_map(message.get('payload', {}).get('headers', []))
         
-        # Parse timestamp
-        timestamp = int(message.get('internalDate', 0)) / 1000
-        received_at = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+        received_at = self._parse_internal_date(message) or datetime.utcnow()
         
         # Check if email is trashed
         labels = message.get('labelIds', [])
@@ -322,8 +611,8 @@ class GmailService:
         return {
             'gmail_id': message['id'],
             'thread_id': message.get('threadId'),
-            'subject': headers.get('Subject', 'No Subject'),
-            'sender': headers.get('From', 'Unknown'),
+            'subject': headers.get('subject', 'No Subject'),
+            'sender': headers.get('from', 'Unknown'),
             'snippet': message.get('snippet', ''),
             'received_at': received_at,
             'is_read': 'UNREAD' not in labels,
@@ -331,12 +620,22 @@ class GmailService:
             'deleted_at': deleted_at  # Add deleted_at for minimal parsing too
         }
     
+    def _parse_label_state(self, gmail_id: str, labels: List[str]) -> Dict[str, Any]:
+        """Label-derived fields only, for refreshing a stored message without refetching it"""
+        return {
+            'gmail_id': gmail_id,
+            'labels': labels,
+            'is_read': 'UNREAD' not in labels,
+            'is_starred': 'STARRED' in labels,
+            'deleted_at': datetime.utcnow() if 'TRASH' in labels else None
+        }
+    
     def _parse_email(self, message: Dict[str, Any]) -> Dict[str, Any]:
         payload = message['payload']
-        headers = payload.get('headers', [])
         
         # Extract headers
-        header_dict = {h['name']: h['value'] for h in headers}
+        headers = self._header_map(payload.get('headers', []))
+        sender = headers.get('from', '')
         
         # Parse body
         body_text, body_html = self._get_body(payload)
@@ -350,9 +649,7 @@ class GmailService:
         is_starred = 'STARRED' in labels
         is_trashed = 'TRASH' in labels  # Check if email is in Gmail trash
         
-        # Parse timestamp
-        timestamp = int(message.get('internalDate', 0)) / 1000
-        received_at = datetime.fromtimestamp(timestamp) if timestamp else None
+        received_at = self._parse_internal_date(message)
         
         # Set deleted_at if email is in trash
         deleted_at = datetime.utcnow() if is_trashed else None
@@ -360,12 +657,12 @@ class GmailService:
         return {
             'gmail_id': message['id'],
             'thread_id': message.get('threadId'),
-            'subject': header_dict.get('Subject', ''),
-            'sender': header_dict.get('From', ''),
-            'sender_name': self._extract_name(header_dict.get('From', '')),
-            'recipients': self._parse_recipients(header_dict.get('To', '')),
-            'cc': self._parse_recipients(header_dict.get('Cc', '')),
-            'bcc': self._parse_recipients(header_dict.get('Bcc', '')),
+            'subject': headers.get('subject', ''),
+            'sender': sender,
+            'sender_name': self._extract_name(sender),
+            'recipients': self._parse_recipients(headers.get('to', '')),
+            'cc': self._parse_recipients(headers.get('cc', '')),
+            'bcc': self._parse_recipients(headers.get('bcc', '')),
             'body_text': body_text,
             'body_html': body_html,
             'snippet': message.get('snippet', ''),
@@ -378,23 +675,51 @@ class GmailService:
             'received_at': received_at
         }
     
+    def _parse_internal_date(self, message: Dict[str, Any]) -> Optional[datetime]:
+        """internalDate (epoch ms) as a naive UTC datetime, like the utcnow() values stored elsewhere"""
+        internal_date = int(message.get('internalDate', 0))
+        return UNIX_EPOCH + timedelta(milliseconds=internal_date) if internal_date else None
+    
+    def _header_map(self, headers: List[Dict[str, str]], wanted: frozenset = PARSED_HEADERS) -> Dict[str, str]:
+        """Single pass over the header list, keeping only the wanted headers under lowercase names"""
+        header_map = {}
+        for header in headers:
+            name = header['name'].lower()
+            if name in wanted:
+                header_map[name] = header['value']
+        return header_map
+    
     def _get_body(self, payload: Dict[str, Any]) -> tuple:
         body_text = ""
         body_html = ""
         
         if 'parts' in payload:
+            nested = []
             for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body'].get('data', '')
-                    body_text = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-                elif part['mimeType'] == 'text/html':
-                    data = part['body'].get('data', '')
-                    body_html = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+                mime_type = part.get('mimeType', '')
+                if part.get('filename'):
+                    continue  # attachment, not a body
+                if mime_type == 'text/plain' and not body_text:
+                    body_text = self._decode_body_data(part['body'].get('data', ''))
+                elif mime_type == 'text/html' and not body_html:
+                    body_html = self._decode_body_data(part['body'].get('data', ''))
+                elif mime_type.startswith('multipart/'):
+                    nested.append(part)
+                if body_text and body_html:
+                    return body_text, body_html
+            
+            # Descend into nested multiparts (e.g. alternative inside mixed) only for what's still missing
+            for part in nested:
+                nested_text, nested_html = self._get_body(part)
+                body_text = body_text or nested_text
+                body_html = body_html or nested_html
+                if body_text and body_html:
+                    break
         else:
             body = payload.get('body', {})
             data = body.get('data', '')
             if data:
-                decoded = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+                decoded = self._decode_body_data(data)
                 if payload.get('mimeType') == 'text/html':
                     body_html = decoded
                 else:
@@ -402,6 +727,16 @@ class GmailService:
         
         return body_text, body_html
     
+    def _decode_body_data(self, data: str) -> str:
+        """Decode a base64url body part; a malformed part yields '' instead of failing the message"""
+        if not data:
+            return ""
+        try:
+            return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+        except (binascii.Error, ValueError) as e:
+            logger.warning(f"Skipping malformed body part: {e}")
+            return ""
+    
     def _get_attachments(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
         attachments = []
         
@@ -419,85 +754,132 @@ class GmailService:
         return attachments
     
     def _extract_name(self, from_header: str) -> str:
-        if '<' in from_header:
-            return from_header.split('<')[0].strip().strip('"')
-        return from_header
+        # parseaddr unquotes "Doe, John" and copes with '<' inside quoted names; bare addresses keep the address
+        name, address = parseaddr(from_header)
+        return name or address or from_header
     
     def _parse_recipients(self, header_value: str) -> List[str]:
         if not header_value:
             return []
-        return [r.strip() for r in header_value.split(',')]
+        # getaddresses keeps quoted display names like "Doe, John" intact
+        return [self._display_address(name, address) for name, address in getaddresses([header_value]) if address]
     
-    def mark_as_read(self, user: User, email_id: str) -> bool:
+    def _display_address(self, name: str, address: str) -> str:
+        """'Name <addr>' for storage and display: quoted where needed, never RFC 2047-encoded"""
         try:
-            service = self.get_service(user)
-            service.users().messages().modify(
-                userId='me',
-                id=email_id,
-                body={'removeLabelIds': ['UNREAD']}
-            ).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Error marking email as read: {e}")
-            return False
+            return str(Address(display_name=name, addr_spec=address))
+        except (ValueError, HeaderParseError):
+            # Address rejects unusual local parts that Gmail still delivers
+            return f"{name} <{address}>" if name else address
     
-    def mark_as_unread(self, user: User, email_id: str) -> bool:
-        try:
-            service = self.get_service(user)
-            service.users().messages().modify(
-                userId='me',
-                id=email_id,
-                body={'addLabelIds': ['UNREAD']}
-            ).execute()
-            return True
-        except Exception as e:
-            logger.error(f"Error marking email as unread: {e}")
-            return False
+    def mark_as_read(self, user: User, email_id: str, db: Session = None) -> bool:
+        return self.batch_mark_as_read(user, [email_id], db)
+    
+    def mark_as_unread(self, user: User, email_id: str, db: Session = None) -> bool:
+        return self.batch_mark_as_unread(user, [email_id], db)
+    
+    def star_email(self, user: User, email_id: str, db: Session = None) -> bool:
+        return self.batch_star(user, [email_id], db)
+    
+    def unstar_email(self, user: User, email_id: str, db: Session = None) -> bool:
+        return self.batch_unstar(user, [email_id], db)
+    
+    def batch_mark_as_read(self, user: User, email_ids: List[str], db: Session = None) -> bool:
+        return self.batch_modify(user, email_ids, remove_label_ids=['UNREAD'], db=db)
+    
+    def batch_mark_as_unread(self, user: User, email_ids: List[str], db: Session = None) -> bool:
+        return self.batch_modify(user, email_ids, add_label_ids=['UNREAD'], db=db)
+    
+    def batch_star(self, user: User, email_ids: List[str], db: Session = None) -> bool:
+        return self.batch_modify(user, email_ids, add_label_ids=['STARRED'], db=db)
     
-    def star_email(self, user: User, email_id: str) -> bool:
+    def batch_unstar(self, user: User, email_ids: List[str], db: Session = None) -> bool:
+        return self.batch_modify(user, email_ids, remove_label_ids=['STARRED'], db=db)
+    
+    def batch_modify(self, user: User, email_ids: List[str], add_label_ids: List[str] = None,
+                     remove_label_ids: List[str] = None, db: Session = None) -> bool:
+        """Add/remove labels on messages with batchModify, up to GMAIL_BATCH_LIMIT per request.
+        
+        When db is given the stored rows are updated to match; the caller commits.
+        """
+        body = {}
+        if add_label_ids:
+            body['addLabelIds'] = add_label_ids
+        if remove_label_ids:
+            body['removeLabelIds'] = remove_label_ids
         try:
             service = self.get_service(user)
-            service.users().messages().modify(
-                userId='me',
-                id=email_id,
-                body={'addLabelIds': ['STARRED']}
-            ).execute()
-            return True
+            for start in range(0, len(email_ids), GMAIL_BATCH_LIMIT):
+                service.users().messages().batchModify(
+                    userId='me',
+                    body={'ids': email_ids[start:start + GMAIL_BATCH_LIMIT], **body}
+                ).execute(num_retries=GMAIL_NUM_RETRIES)
         except Exception as e:
-            logger.error(f"Error starring email: {e}")
+            logger.error(f"Error modifying labels on {len(email_ids)} email(s): {e}")
             return False
+        if db is not None:
+            self._apply_label_changes(db, user, email_ids, add_label_ids or [], remove_label_ids or [])
+        return True
     
-    def unstar_email(self, user: User, email_id: str) -> bool:
+    def _apply_label_changes(self, db: Session, user: User, email_ids: List[str],
+                             add_label_ids: List[str], remove_label_ids: List[str]):
+        """Mirror a batchModify onto stored rows: one select and one executemany UPDATE per chunk"""
+        for start in range(0, len(email_ids), GMAIL_BATCH_LIMIT):
+            rows = db.query(Email.id, Email.labels).filter(
+                Email.user_id == user.id,
+                Email.gmail_id.in_(email_ids[start:start + GMAIL_BATCH_LIMIT])
+            ).all()
+            if not rows:
+                continue
+            changes = []
+            for row in rows:
+                labels = [label for label in (row.labels or []) if label not in remove_label_ids]
+                labels += [label for label in add_label_ids if label not in labels]
+                changes.append({
+                    'id': row.id,
+                    'labels': labels,
+                    'is_read': 'UNREAD' not in labels,
+                    'is_starred': 'STARRED' in labels
+                })
+            # ORM bulk UPDATE by primary key
+            db.execute(update(Email), changes)
+    
+    def move_to_trash(self, user: User, email_id: str) -> bool:
         try:
             service = self.get_service(user)
-            service.users().messages().modify(
-                userId='me',
-                id=email_id,
-                body={'removeLabelIds': ['STARRED']}
-            ).execute()
+            service.users().messages().trash(userId='me', id=email_id).execute(num_retries=GMAIL_NUM_RETRIES)
             return True
         except Exception as e:
-            logger.error(f"Error unstarring email: {e}")
+            logger.error(f"Error moving email to trash: {e}")
             return False
     
-    def move_to_trash(self, user: User, email_id: str) -> bool:
+    def restore_from_trash(self, user: User, email_id: str) -> bool:
         try:
             service = self.get_service(user)
-            service.users().messages().trash(userId='me', id=email_id).execute()
+            service.users().messages().untrash(userId='me', id=email_id).execute(num_retries=GMAIL_NUM_RETRIES)
             return True
         except Exception as e:
-            logger.error(f"Error moving email to trash: {e}")
+            logger.error(f"Error restoring email from trash: {e}")
             return False
     
-    def restore_from_trash(self, user: User, email_id: str) -> bool:
+    def batch_delete(self, user: User, email_ids: List[str]) -> bool:
+        """Permanently delete messages, up to GMAIL_BATCH_LIMIT per request"""
         try:
             service = self.get_service(user)
-            service.users().messages().untrash(userId='me', id=email_id).execute()
+            for start in range(0, len(email_ids), GMAIL_BATCH_LIMIT):
+                service.users().messages().batchDelete(
+                    userId='me',
+                    body={'ids': email_ids[start:start + GMAIL_BATCH_LIMIT]}
+                ).execute(num_retries=GMAIL_NUM_RETRIES)
             return True
         except Exception as e:
-            logger.error(f"Error restoring email from trash: {e}")
+            logger.error(f"Error batch deleting emails: {e}")
             return False
     
+    def batch_restore_from_trash(self, user: User, email_ids: List[str], db: Session = None) -> bool:
+        """Restore messages from trash, up to GMAIL_BATCH_LIMIT per request"""
+        return self.batch_modify(user, email_ids, remove_label_ids=['TRASH'], db=db)
+    
     def create_label(self, user: User, label_name: str) -> Optional[str]:
         """Create a new Gmail label/folder"""
         try:
@@ -510,29 +892,42 @@ class GmailService:
             created_label = service.users().labels().create(
                 userId='me',
                 body=label_object
-            ).execute()
+            ).execute(num_retries=GMAIL_NUM_RETRIES)
             logger.info(f"Created label: {label_name} with ID: {created_label['id']}")
+            cached = self._label_cache.get(user.id)
+            if cached:
+                cached[1][label_name] = created_label['id']
             return created_label['id']
         except Exception as e:
             if 'already exists' in str(e):
-                # Label already exists, get its ID
+                # Label was created elsewhere since we cached the list; reload and get its ID
                 try:
-                    labels = service.users().labels().list(userId='me').execute()
-                    for label in labels.get('labels', []):
-                        if label['name'] == label_name:
-                            return label['id']
-                except:
+                    self._label_cache.pop(user.id, None)
+                    label_id = self._label_map(user).get(label_name)
+                    if label_id:
+                        return label_id
+                except Exception:
                     pass
             logger.error(f"Error creating label: {e}")
             return None
     
+    def _label_map(self, user: User) -> Dict[str, str]:
+        """Label name -> id for the user, from one labels.list call cached for LABEL_CACHE_TTL"""
+        cached = self._label_cache.get(user.id)
+        if cached and datetime.utcnow() - cached[0] < LABEL_CACHE_TTL:
+            return cached[1]
+        results = self.get_service(user).users().labels().list(userId='me', fields='labels(id,name)').execute(num_retries=GMAIL_NUM_RETRIES)
+        label_map = {label['name']: label['id'] for label in results.get('labels', [])}
+        self._label_cache[user.id] = (datetime.utcnow(), label_map)
+        return label_map
+    
     def move_to_label(self, user: User, email_id: str, label_name: str) -> bool:
         """Move email to a specific label/folder"""
         try:
             service = self.get_service(user)
             
-            # First ensure the label exists
-            label_id = self.create_label(user, label_name)
+            # Use the cached label id; only create the label when it doesn't exist yet
+            label_id = self._label_map(user).get(label_name) or self.create_label(user, label_name)
             if not label_id:
                 logger.error(f"Could not create or find label: {label_name}")
                 return False
@@ -542,7 +937,7 @@ class GmailService:
                 userId='me',
                 id=email_id,
                 body={'addLabelIds': [label_id]}
-            ).execute()
+            ).execute(num_retries=GMAIL_NUM_RETRIES)
             
             logger.info(f"Moved email {email_id} to label {label_name}")
             return True
@@ -553,9 +948,7 @@ class GmailService:
     def list_labels(self, user: User) -> List[Dict[str, str]]:
         """List all labels/folders for a user"""
         try:
-            service = self.get_service(user)
-            results = service.users().labels().list(userId='me').execute()
-            labels = results.get('labels', [])
+            label_map = self._label_map(user)
             
             # Filter out system labels and return user labels
             user_labels = []
@@ -564,11 +957,11 @@ class GmailService:
                            'CATEGORY_SOCIAL', 'CATEGORY_PROMOTIONS', 'CATEGORY_UPDATES',
                            'CATEGORY_FORUMS']
             
-            for label in labels:
-                if label['name'] not in system_labels and not label['name'].startswith('CATEGORY_'):
+            for name, label_id in label_map.items():
+                if name not in system_labels and not name.startswith('CATEGORY_'):
                     user_labels.append({
-                        'id': label['id'],
-                        'name': label['name']
+                        'id': label_id,
+                        'name': name
                     })
             
             return user_labels
@@ -591,7 +984,7 @@ class GmailService:
             if thread_id:
                 send_body['threadId'] = thread_id
             
-            # Send message
+            # Send message; not retried automatically, since a retry after a lost response would send twice
             result = service.users().messages().send(
                 userId='me',
                 body=send_body
@@ -602,6 +995,39 @@ class GmailService:
             logger.error(f"Error sending email: {e}")
             raise
     
+    def send_emails_batch(self, user: User, messages: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Send many messages through HTTP batches of GMAIL_HTTP_BATCH_SIZE.
+        
+        Each item takes send_email's keyword arguments (to, subject, body, cc, bcc, thread_id, message_id).
+        Returns the sent message resources in input order, with None for any message that failed.
+        """
+        service = self.get_service(user)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+        
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error sending batched email {request_id}: {exception}")
+            else:
+                results[int(request_id)] = response
+        
+        for start in range(0, len(messages), GMAIL_HTTP_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for index in range(start, min(start + GMAIL_HTTP_BATCH_SIZE, len(messages))):
+                item = messages[index]
+                send_body = {'raw': self._create_message(
+                    user.email, item['to'], item['subject'], item['body'], item.get('cc'), item.get('bcc'),
+                    thread_id=item.get('thread_id'), message_id=item.get('message_id')
+                )}
+                if item.get('thread_id'):
+                    send_body['threadId'] = item['thread_id']
+                batch.add(service.users().messages().send(userId='me', body=send_body), request_id=str(index))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.error(f"Error sending email batch starting at {start}: {e}")
+        
+        return results
+    
     def reply_to_email(self, user: User, original_message_id: str, thread_id: str,
                       to: str, subject: str, body: str) -> Dict[str, Any]:
         """Send a reply in the same thread"""
@@ -613,15 +1039,14 @@ class GmailService:
                 userId='me',
                 id=original_message_id,
                 format='metadata',
-                metadataHeaders=['Message-ID']
-            ).execute()
+                metadataHeaders=['Message-ID'],
+                fields='payload/headers'
+            ).execute(num_retries=GMAIL_NUM_RETRIES)
             
-            # Extract Message-ID for In-Reply-To header
-            message_id = None
-            for header in original.get('payload', {}).get('headers', []):
-                if header['name'] == 'Message-ID':
-                    message_id = header['value']
-                    break
+            # Extract Message-ID for In-Reply-To header (some senders spell it Message-Id)
+            message_id = self._header_map(
+                original.get('payload', {}).get('headers', []), REPLY_HEADERS
+            ).get('message-id')
             
             # Send reply with thread context
             return self.send_email(
@@ -639,24 +1064,47 @@ class GmailService:
     def _create_message(self, sender: str, to: List[str], subject: str, 
                        body: str, cc: List[str] = None, bcc: List[str] = None,
                        thread_id: str = None, message_id: str = None) -> str:
-        from email.mime.text import MIMEText
-        from email.mime.multipart import MIMEMultipart
-        
-        message = MIMEMultipart()
-        message['From'] = sender
-        message['To'] = ', '.join(to)
-        message['Subject'] = subject
-        
+        """Assemble a single-part text/plain RFC 5322 message and base64url-encode it for messages.send"""
+        headers = [
+            ('MIME-Version', '1.0'),
+            ('From', self._encode_addresses([sender])),
+            ('To', self._encode_addresses(to)),
+            ('Subject', self._encode_header(subject, 'Subject')),
+        ]
         if cc:
-            message['Cc'] = ', '.join(cc)
+            headers.append(('Cc', self._encode_addresses(cc)))
         if bcc:
-            message['Bcc'] = ', '.join(bcc)
+            headers.append(('Bcc', self._encode_addresses(bcc)))
         
         # Add threading headers for replies
         if message_id:
-            message['In-Reply-To'] = message_id
-            message['References'] = message_id
+            headers.append(('In-Reply-To', self._encode_header(message_id, 'In-Reply-To')))
+            headers.append(('References', self._encode_header(message_id, 'References')))
+        
+        headers.append(('Content-Type', 'text/plain; charset="utf-8"'))
+        headers.append(('Content-Transfer-Encoding', 'base64'))
         
-        message.attach(MIMEText(body, 'plain'))
+        message = bytearray()
+        for name, value in headers:
+            message += f"{name}: {value}\r\n".encode('utf-8')
+        message += b"\r\n"
+        encoded_body = base64.b64encode(body.encode('utf-8'))
+        for start in range(0, len(encoded_body), MIME_BASE64_LINE_LENGTH):
+            message += encoded_body[start:start + MIME_BASE64_LINE_LENGTH] + b"\r\n"
         
-        return base64.urlsafe_b64encode(message.as_bytes()).decode()
\ No newline at end of file
+        return base64.urlsafe_b64encode(bytes(message)).decode()
+    
+    def _encode_header(self, value: str, header_name: str) -> str:
+        """Drop CR/LF (header injection), RFC 2047-encode non-ASCII text and fold long values"""
+        value = self._single_line(value)
+        charset = 'us-ascii' if value.isascii() else 'utf-8'
+        # 76-column folding keeps every encoded word under RFC 2047's 75-character cap
+        return Header(value, charset, maxlinelen=76, header_name=header_name).encode(linesep='\r\n')
+    
+    def _encode_addresses(self, addresses: List[str]) -> str:
+        """Format an address list, RFC 2047-encoding any non-ASCII display names"""
+        pairs = getaddresses([self._single_line(address) for address in addresses])
+        return ', '.join(formataddr(pair, charset='utf-8') for pair in pairs if pair[1])
+    
+    def _single_line(self, value: str) -> str:
+        return ' '.join((value or '').splitlines())
@@ -48,21 +48,16 @@ class OAuthStateManager:
         self.states[state] = {
             "provider": provider,
             "created_at": datetime.utcnow(),
-            "redirect_to": redirect_to,
-            "used": False
+            "redirect_to": redirect_to
         }
         self._cleanup_old_states()
         return state
     
     def verify_state(self, state: str, provider: str) -> bool:
-        """Verify a state token"""
-        if state not in self.states:
-            return False
-        
-        state_data = self.states[state]
-        
-        # Check if already used
-        if state_data["used"]:
+        """Verify and consume a state token"""
+        # Popping is the used-bit: a replayed or concurrent callback finds nothing
+        state_data = self.states.pop(state, None)
+        if state_data is None:
             return False
         
         # Check provider matches
@@ -71,13 +66,7 @@ class OAuthStateManager:
         
         # Check age
         age = datetime.utcnow() - state_data["created_at"]
-        if age > timedelta(minutes=self.max_age_minutes):
-            del self.states[state]
-            return False
-        
-        # Mark as used
-        self.states[state]["used"] = True
-        return True
+        return age <= timedelta(minutes=self.max_age_minutes)
     
     def get_redirect(self, state: str) -> Optional[str]:
         """Get redirect URL for state"""
@@ -86,17 +75,14 @@ class OAuthStateManager:
         return None
     
     def _cleanup_old_states(self):
-        """Remove expired states"""
-        now = datetime.utcnow()
-        cutoff = now - timedelta(minutes=self.max_age_minutes)
+        """Remove expired states; dicts keep creation order, so they are always at the front"""
+        cutoff = datetime.utcnow() - timedelta(minutes=self.max_age_minutes)
         
-        expired = [
-            state for state, data in self.states.items()
-            if data["created_at"] < cutoff
-        ]
-        
-        for state in expired:
-            del self.states[state]
+        while self.states:
+            oldest = next(iter(self.states))
+            if self.states[oldest]["created_at"] >= cutoff:
+                break
+            del self.states[oldest]
 
 
 class OAuthManager:
@@ -105,6 +91,27 @@ class OAuthManager:
     def __init__(self):
         self.state_manager = OAuthStateManager()
         self.providers = self._initialize_providers()
+        # Static part of each provider's authorization URL, built once
+        self._auth_url_prefixes = {
+            name: self._build_auth_url_prefix(name, provider)
+            for name, provider in self.providers.items()
+        }
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for token and userinfo calls, created on first use"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._http
+    
+    async def close(self):
+        """Close the shared HTTP client (called on app shutdown)"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
     
     def _initialize_providers(self) -> Dict[str, OAuthConfig]:
         """Initialize OAuth provider configurations"""
@@ -167,13 +174,15 @@ class OAuthManager:
             return None
         
         state = self.state_manager.create_state(provider_name, redirect_to)
-        
+        return f"{self._auth_url_prefixes[provider_name]}&{urlencode({'state': state})}"
+    
+    def _build_auth_url_prefix(self, provider_name: str, provider: OAuthConfig) -> str:
+        """Authorization URL with every parameter except the per-request state"""
         params = {
             "client_id": provider.client_id,
             "redirect_uri": provider.redirect_uri,
             "response_type": "code",
             "scope": " ".join(provider.scopes),
-            "state": state,
             "access_type": "offline",
             "prompt": "consent"
         }
@@ -186,6 +195,9 @@ class OAuthManager:
     
     async def exchange_code(self, provider_name: str, code: str, state: str) -> Optional[Dict]:
         """Exchange authorization code for tokens"""
+        # Read the redirect before verify_state consumes the state
+        redirect_to = self.state_manager.get_redirect(state)
+        
         # Verify state
         if not self.state_manager.verify_state(state, provider_name):
             raise ValueError("Invalid or expired state")
@@ -194,29 +206,27 @@ class OAuthManager:
         if not provider:
             return None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                provider.token_url,
-                data={
-                    "code": code,
-                    "client_id": provider.client_id,
-                    "client_secret": provider.client_secret,
-                    "redirect_uri": provider.redirect_uri,
-                    "grant_type": "authorization_code"
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Token exchange failed: {response.text}")
-            
-            tokens = response.json()
-            
-            # Get redirect URL if stored
-            redirect_to = self.state_manager.get_redirect(state)
-            if redirect_to:
-                tokens["redirect_to"] = redirect_to
-            
-            return tokens
+        client = self._client()
+        response = await client.post(
+            provider.token_url,
+            data={
+                "code": code,
+                "client_id": provider.client_id,
+                "client_secret": provider.client_secret,
+                "redirect_uri": provider.redirect_uri,
+                "grant_type": "authorization_code"
+            }
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Token exchange failed: {response.text}")
+        
+        tokens = response.json()
+        
+        if redirect_to:
+            tokens["redirect_to"] = redirect_to
+        
+        return tokens
     
     async def get_user_info(self, provider_name: str, access_token: str) -> Optional[Dict]:
         """Get user information from OAuth provider"""
@@ -224,43 +234,43 @@ class OAuthManager:
         if not provider:
             return None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                provider.user_info_url,
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Failed to get user info: {response.text}")
-            
-            user_info = response.json()
-            
-            # Normalize user info across providers
-            normalized = {
-                "provider": provider_name,
-                "id": None,
-                "email": None,
-                "name": None,
-                "picture": None,
-                "raw": user_info
-            }
-            
-            if provider_name == OAuthProvider.GOOGLE.value:
-                normalized.update({
-                    "id": user_info.get("id"),
-                    "email": user_info.get("email"),
-                    "name": user_info.get("name"),
-                    "picture": user_info.get("picture")
-                })
-            elif provider_name == OAuthProvider.MICROSOFT.value:
-                normalized.update({
-                    "id": user_info.get("id"),
-                    "email": user_info.get("mail") or user_info.get("userPrincipalName"),
-                    "name": user_info.get("displayName"),
-                    "picture": None  # Microsoft doesn't provide picture in basic info
-                })
-            
-            return normalized
+        client = self._client()
+        response = await client.get(
+            provider.user_info_url,
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Failed to get user info: {response.text}")
+        
+        user_info = response.json()
+        
+        # Normalize user info across providers
+        normalized = {
+            "provider": provider_name,
+            "id": None,
+            "email": None,
+            "name": None,
+            "picture": None,
+            "raw": user_info
+        }
+        
+        if provider_name == OAuthProvider.GOOGLE.value:
+            normalized.update({
+                "id": user_info.get("id"),
+                "email": user_info.get("email"),
+                "name": user_info.get("name"),
+                "picture": user_info.get("picture")
+            })
+        elif provider_name == OAuthProvider.MICROSOFT.value:
+            normalized.update({
+                "id": user_info.get("id"),
+                "email": user_info.get("mail") or user_info.get("userPrincipalName"),
+                "name": user_info.get("displayName"),
+                "picture": None  # Microsoft doesn't provide picture in basic info
+            })
+        
+        return normalized
     
     async def refresh_token(self, provider_name: str, refresh_token: str) -> Optional[Dict]:
         """Refresh access token using refresh token"""
@@ -268,21 +278,21 @@ class OAuthManager:
         if not provider:
             return None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                provider.token_url,
-                data={
-                    "refresh_token": refresh_token,
-                    "client_id": provider.client_id,
-                    "client_secret": provider.client_secret,
-                    "grant_type": "refresh_token"
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Token refresh failed: {response.text}")
-            
-            return response.json()
+        client = self._client()
+        response = await client.post(
+            provider.token_url,
+            data={
+                "refresh_token": refresh_token,
+                "client_id": provider.client_id,
+                "client_secret": provider.client_secret,
+                "grant_type": "refresh_token"
+            }
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Token refresh failed: {response.text}")
+        
+        return response.json()
     
     def list_providers(self) -> list:
         """List available OAuth providers"""
@@ -1,5 +1,7 @@
 import os
+import re
 import json
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
@@ -16,6 +18,38 @@ from core.saig_intelligence import SAIGIntelligence
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Labelled exchanges sent ahead of every intent classification (few-shot)
+INTENT_EXAMPLES = [
+    ("Find the emails from Sarah about the budget", "search_emails"),
+    ("Write an email to john@example.com asking to move our meeting to Friday", "compose_email"),
+    ("Reply saying I'll have it done by Monday", "reply_email"),
+    ("Mark this one as read", "mark_read"),
+    ("Give me a summary of my unread emails", "summarize"),
+    ("Add a follow-up task to send the contract", "create_action"),
+    ("What's on my to-do list?", "list_actions"),
+    ("Delete all the newsletters from last week", "delete_email"),
+    ("Move this to my Receipts folder", "move_to_folder"),
+    ("Create a label called Travel", "create_folder"),
+    ("Which folders do I have?", "list_folders"),
+    ("Star this email", "star_email"),
+    ("What can you do?", "help"),
+]
+
+# Unambiguous phrasings resolved without a model call. Each pattern matches a whole short command
+# about emails; anything else (e.g. "Delete my reply and write a new one") goes to the model.
+_EMAIL_OBJECT = r"(this( one)?|it|all|(the |this |that |these |all( of)?( my)? |my )?(emails?|messages?))"
+INTENT_PATTERNS = [
+    (re.compile(r"^\s*(help|what can you do)\s*[?.!]*\s*$", re.I), "help"),
+    (re.compile(r"^\s*(list|show)( me)?( all)?( my)? (action items|actions|tasks|to-?dos)\s*[?.!]*\s*$", re.I), "list_actions"),
+    (re.compile(r"^\s*(list|show)( me)?( all)?( my)? (folders|labels)\s*[?.!]*\s*$", re.I), "list_folders"),
+    (re.compile(r"^\s*(create|make)( an?)?( new)? (folder|label)\b", re.I), "create_folder"),
+    (re.compile(rf"^\s*mark {_EMAIL_OBJECT} (as )?read\s*[.!]*\s*$", re.I), "mark_read"),
+    (re.compile(rf"^\s*(summari[sz]e|tl;?dr)( {_EMAIL_OBJECT}| my inbox)?\s*[?.!]*\s*$", re.I), "summarize"),
+    (re.compile(rf"^\s*(delete|trash) {_EMAIL_OBJECT}\s*[.!]*\s*$", re.I), "delete_email"),
+    (re.compile(rf"^\s*move {_EMAIL_OBJECT} (in)?to( the| my)? [\w -]+ (folder|label)\s*[.!]*\s*$", re.I), "move_to_folder"),
+    (re.compile(r"^\s*(find|search( for)?|show( me)?)( all)?( the| my)? (emails?|messages?) (from|about|with|containing) .+$", re.I), "search_emails"),
+]
+
 class SAIGAssistant:
     def __init__(self):
         # Load Anthropic API key from environment
@@ -33,6 +67,8 @@ class SAIGAssistant:
         self.http_client = httpx.AsyncClient(timeout=30.0)
         # Use Claude 3.5 Haiku for faster responses
         self.model = "claude-3-5-haiku-20241022"
+        # Intent classification is a one-word label; the smallest model answers it fastest
+        self.intent_model = "claude-3-haiku-20240307"
     
     async def process_message(self, db: Session, user: User, message: str, 
                              context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -187,8 +223,13 @@ class SAIGAssistant:
         
         return email_context
     
-    async def _call_anthropic(self, prompt: str, max_tokens: int = 300, temperature: float = 0.3) -> str:
-        """Helper method to call Anthropic API with Claude 3.5 Haiku"""
+    async def _call_anthropic(self, prompt: str, max_tokens: int = 300, temperature: float = 0.3,
+                              model: Optional[str] = None, system: Optional[str] = None,
+                              examples: Optional[List[tuple]] = None) -> str:
+        """Helper method to call Anthropic API with Claude 3.5 Haiku, or another model if given.
+        
+        examples are (user, assistant) pairs sent as prior turns ahead of the prompt.
+        """
         if not self.anthropic_api_key:
             return "Anthropic API not configured. Please set ANTHROPIC_API_KEY in your .env file."
         
@@ -199,12 +240,20 @@ class SAIGAssistant:
                 "content-type": "application/json"
             }
             
+            messages = []
+            for example, answer in examples or []:
+                messages.append({"role": "user", "content": example})
+                messages.append({"role": "assistant", "content": answer})
+            messages.append({"role": "user", "content": prompt})
+            
             data = {
-                "model": self.model,
+                "model": model or self.model,
                 "max_tokens": max_tokens,
                 "temperature": temperature,
-                "messages": [{"role": "user", "content": prompt}]
+                "messages": messages
             }
+            if system:
+                data["system"] = system
             
             response = await self.http_client.post(
                 self.api_url,
@@ -228,10 +277,13 @@ class SAIGAssistant:
         # Check for explicit reply intent
         if "Please read this email and generate" in message or "Reply to this email" in message.lower():
             return 'reply_email'
-            
-        prompt = f"""Analyze the user's message and determine their intent.
         
-User message: {message}
+        # Obvious commands skip the model round-trip
+        for pattern, intent in INTENT_PATTERNS:
+            if pattern.search(message):
+                return intent
+            
+        system = f"""Classify the user's message about their email into one intent.
 
 Available intents:
 - search_emails: User wants to find specific emails
@@ -258,7 +310,10 @@ Context:
 Return only the intent name, nothing else."""
 
         try:
-            intent = await self._call_anthropic(prompt, max_tokens=50, temperature=0.3)
+            intent = await self._call_anthropic(
+                message, max_tokens=8, temperature=0.0,
+                model=self.intent_model, system=system, examples=INTENT_EXAMPLES
+            )
             intent = intent.strip().lower()
             
             # Validate intent
@@ -360,7 +415,7 @@ Return only the search terms, nothing else."""
             
             if email and not email.is_read:
                 # Mark in Gmail
-                if self.gmail_service.mark_as_read(user, email.gmail_id):
+                if await asyncio.to_thread(self.gmail_service.mark_as_read, user, email.gmail_id, db):
                     email.is_read = True
                     db.commit()
                     return f"Marked '{email.subject}' as read.", ["marked_read"]
@@ -564,7 +619,7 @@ Return only the folder name, nothing else."""
                 return "Please specify a name for the new folder.", []
             
             # Create folder in Gmail
-            label_id = self.gmail_service.create_label(user, folder_name)
+            label_id = await asyncio.to_thread(self.gmail_service.create_label, user, folder_name)
             if label_id:
                 return f"Created new folder '{folder_name}'. You can now move emails to this folder.", ["folder_created"]
             else:
@@ -577,7 +632,7 @@ Return only the folder name, nothing else."""
     async def _list_folders(self, user: User) -> str:
         """List all available folders/labels"""
         try:
-            labels = self.gmail_service.list_labels(user)
+            labels = await asyncio.to_thread(self.gmail_service.list_labels, user)
             
             if not labels:
                 return "You don't have any custom folders yet. You can ask me to create one!"
@@ -1151,30 +1206,23 @@ Just tell me what you need help with!"""
             # Get uncategorized emails
             emails = db.query(Email).filter(
                 Email.user_id == user.id,
-                Email.deleted_at.is_(None)
-            ).limit(50).all()
+                Email.deleted_at.is_(None),
+                Email.category.is_(None)
+            ).limit(20).all()
             
             categorized_count = 0
             categories_applied = {}
             
             for email in emails:
-                # Check if already categorized
-                if email.labels and any(label.startswith("CATEGORY/") for label in email.labels):
-                    continue
-                
                 # Detect category
                 category = await self.intelligence.detect_email_category(email)
                 
                 # Update email
-                if not email.labels:
-                    email.labels = []
-                email.labels.append(f"CATEGORY/{category.upper()}")
+                email.category = category
+                email.labels = (email.labels or []) + [f"CATEGORY/{category.upper()}"]
                 
                 categorized_count += 1
                 categories_applied[category] = categories_applied.get(category, 0) + 1
-                
-                if categorized_count >= 20:  # Limit per request
-                    break
             
             db.commit()
             
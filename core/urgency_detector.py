@@ -45,6 +45,20 @@ class UrgencyDetector:
         'director', 'manager', 'supervisor', 'head of', 'chief', 'executive'
     ]
     
+    # [URGENT]-style subject tags
+    PRIORITY_TAG_PATTERN = re.compile(r'\[(urgent|important|action|priority)\]')
+    
+    # Common deadline patterns, compiled once for every scored email
+    DEADLINE_PATTERNS = [
+        (re.compile(r'by (\w+day)'), 'relative_day'),  # by Monday, by Friday
+        (re.compile(r'by (\d{1,2}/\d{1,2})'), 'date'),  # by 12/25
+        (re.compile(r'due (\w+day)'), 'relative_day'),  # due Monday
+        (re.compile(r'due (\d{1,2}/\d{1,2})'), 'date'),  # due 12/25
+        (re.compile(r'before (\w+day)'), 'relative_day'),  # before Friday
+        (re.compile(r'by end of (\w+)'), 'end_of'),  # by end of week/month/day
+        (re.compile(r'within (\d+) (hours?|days?)'), 'within'),  # within 24 hours
+    ]
+    
     def __init__(self, db: Session = None):
         self.db = db
         self.urgency_threshold = int(os.getenv('URGENCY_THRESHOLD', '40'))
@@ -112,7 +126,7 @@ class UrgencyDetector:
             reasons.append("Multiple exclamation marks")
         
         # [URGENT] or similar tags
-        if re.search(r'\[(urgent|important|action|priority)\]', subject_lower):
+        if self.PRIORITY_TAG_PATTERN.search(subject_lower):
             score += 20
             reasons.append("Priority tag in subject")
         
@@ -196,19 +210,8 @@ class UrgencyDetector:
         deadlines = []
         text_lower = text.lower()
         
-        # Common deadline patterns
-        patterns = [
-            (r'by (\w+day)', 'relative_day'),  # by Monday, by Friday
-            (r'by (\d{1,2}/\d{1,2})', 'date'),  # by 12/25
-            (r'due (\w+day)', 'relative_day'),  # due Monday
-            (r'due (\d{1,2}/\d{1,2})', 'date'),  # due 12/25
-            (r'before (\w+day)', 'relative_day'),  # before Friday
-            (r'by end of (\w+)', 'end_of'),  # by end of week/month/day
-            (r'within (\d+) (hours?|days?)', 'within'),  # within 24 hours
-        ]
-        
-        for pattern, pattern_type in patterns:
-            matches = re.finditer(pattern, text_lower)
+        for pattern, pattern_type in self.DEADLINE_PATTERNS:
+            matches = pattern.finditer(text_lower)
             for match in matches:
                 context = match.group(0)
                 
@@ -69,7 +69,7 @@ def diagnose_trash_sync():
         )
         
         # Build service
-        service = build('gmail', 'v1', credentials=creds)
+        service = build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
         
         # Query for emails in trash
         results = service.users().messages().list(
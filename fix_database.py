@@ -22,6 +22,7 @@ def fix_database():
             ("urgency_analyzed_at", "DATETIME"),
             ("auto_actions_created", "BOOLEAN DEFAULT FALSE"),
             ("action_count", "INTEGER DEFAULT 0"),
+            ("category", "VARCHAR"),
             ("created_at", "DATETIME DEFAULT CURRENT_TIMESTAMP"),
             ("updated_at", "DATETIME DEFAULT CURRENT_TIMESTAMP")
         ]
@@ -36,6 +37,61 @@ def fix_database():
                     if "duplicate column name" not in str(e):
                         print(f"✗ Error adding {column_name}: {e}")
         
+        # Indexes backing mailbox and trash listings
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emails_user_deleted_received "
+            "ON emails (user_id, deleted_at, received_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emails_trashed "
+            "ON emails (user_id, received_at) WHERE deleted_at IS NOT NULL"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_emails_deleted_at ON emails (deleted_at)")
+        
+        # Index the category column and backfill it from existing CATEGORY/* labels
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_emails_category ON emails (category)")
+        cursor.execute("""
+            UPDATE emails SET category = (
+                SELECT lower(substr(value, 10)) FROM json_each(emails.labels)
+                WHERE value LIKE 'CATEGORY/%' LIMIT 1
+            )
+            WHERE category IS NULL AND labels LIKE '%"CATEGORY/%'
+        """)
+        print(f"✓ Backfilled category for {cursor.rowcount} email(s)")
+        
+        # Gmail history checkpoint for incremental sync
+        cursor.execute("PRAGMA table_info(users)")
+        if "last_history_id" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE users ADD COLUMN last_history_id VARCHAR")
+            print("✓ Added column: users.last_history_id")
+        
+        # Unique keys behind the huddle member/email upserts; create_all never adds them to existing tables
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing_tables = {row[0] for row in cursor.fetchall()}
+        for table_name, index_name, key_columns in (
+            ("huddle_members", "uq_huddle_members_huddle_user", "huddle_id, user_email"),
+            ("huddle_emails", "uq_huddle_emails_huddle_email", "huddle_id, email_id"),
+        ):
+            if table_name not in existing_tables:
+                continue
+            # Keep the earliest row of each duplicate group so the unique index can be built
+            cursor.execute(
+                f"DELETE FROM {table_name} WHERE rowid NOT IN "
+                f"(SELECT MIN(rowid) FROM {table_name} GROUP BY {key_columns})"
+            )
+            if cursor.rowcount:
+                print(f"✓ Removed {cursor.rowcount} duplicate row(s) from {table_name}")
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({key_columns})")
+            print(f"✓ Ensured unique index: {index_name}")
+
+        # Replace NULL list columns with empty arrays (stored as SQL NULL or JSON null)
+        for column_name in ("recipients", "cc", "bcc", "labels", "attachments"):
+            cursor.execute(
+                f"UPDATE emails SET {column_name} = '[]' "
+                f"WHERE {column_name} IS NULL OR {column_name} = 'null'"
+            )
+        print("✓ Backfilled empty list columns")
+        
         conn.commit()
         print("\n✓ Database schema updated successfully!")
         
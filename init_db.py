@@ -5,7 +5,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from core.database import Base, engine
+from core.database import engine, init_db
 from sqlalchemy import inspect
 
 def init_database():
@@ -13,7 +13,7 @@ def init_database():
     print("Initializing database...")
     
     # Create all tables
-    Base.metadata.create_all(bind=engine)
+    init_db()
     
     # List created tables
     inspector = inspect(engine)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Render the fallback favicon PNG once and write it to static/saigbox-favicon.png.
+
+Run from CI or a pre-commit hook; the output is committed so nothing is drawn at runtime.
+"""
+import os
+from PIL import Image, ImageDraw
+
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'static', 'saigbox-favicon.png')
+
+def build_favicon(path: str = OUTPUT_PATH):
+    # Create a 512x512 image with transparent background
+    img = Image.new('RGBA', (512, 512), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    
+    # Draw a green leaf shape (simplified)
+    leaf_color = (127, 201, 127, 255)  # #7fc97f with full opacity
+    vein_color = (100, 175, 100, 255)
+    
+    # Draw main leaf body (ellipse)
+    draw.ellipse([100, 50, 400, 350], fill=leaf_color)
+    
+    # Draw leaf stem
+    draw.rectangle([240, 350, 270, 450], fill=leaf_color)
+    
+    # Add some leaf veins
+    draw.line([(256, 100), (256, 350)], fill=vein_color, width=3)
+    draw.line([(200, 150), (256, 200)], fill=vein_color, width=2)
+    draw.line([(312, 150), (256, 200)], fill=vein_color, width=2)
+    draw.line([(200, 250), (256, 300)], fill=vein_color, width=2)
+    draw.line([(312, 250), (256, 300)], fill=vein_color, width=2)
+    
+    img.save(path, 'PNG', optimize=True)
+
+if __name__ == '__main__':
+    build_favicon()
+    print(f"✅ Wrote {os.path.normpath(OUTPUT_PATH)}")